@@ -0,0 +1,92 @@
+import os
+import random
+import sys
+import time
+
+CODES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'codes')
+sys.path.insert(0, CODES)
+
+from automata.dfa import dfa_from_json
+from automata.dfa2regex import ELIMINATION_ORDERS, RegexTooLarge, gen_regex
+from automata.reachability import prune_automaton
+
+MAX_SIZE = 10 ** 7
+
+
+def dfa_data(n, letters, delta, finals):
+    states = [f"q{i}" for i in range(n)]
+    return {
+        'states': states,
+        'letters': letters,
+        'transition_function': [[f"q{i}", a, f"q{delta(i, a)}"] for i in range(n) for a in letters],
+        'start_states': ['q0'],
+        'final_states': [f"q{i}" for i in finals]
+    }
+
+
+def random_dfa(n, k, seed):
+    rng = random.Random(seed)
+    letters = [chr(ord('a') + i) for i in range(k)]
+    table = {(i, a): rng.randrange(n) for i in range(n) for a in letters}
+    finals = [i for i in range(n) if rng.random() < 0.5]
+    return dfa_data(n, letters, lambda i, a: table[(i, a)], finals)
+
+
+def remainder_dfa(n):
+    # Binary numbers that are divisible by n
+    return dfa_data(n, ['0', '1'], lambda i, a: (2 * i + int(a)) % n, [0])
+
+
+def ring_dfa(n):
+    # A cycle with a shortcut back to the start from every state
+    return dfa_data(n, ['a', 'b'], lambda i, a: (i + 1) % n if a == 'a' else 0, [n - 1])
+
+
+def chain_dfa(n):
+    # Words of length at least n over {a, b} whose first n letters are a's
+    return dfa_data(n + 2, ['a', 'b'],
+                    lambda i, a: n + 1 if i == n + 1 else (
+                        (i + 1 if i < n else n) if a == 'a' else (n if i == n else n + 1)),
+                    [n])
+
+
+def corpus():
+    for n in (6, 10, 14, 20):
+        for seed in range(3):
+            yield f"random n={n} k=2 #{seed}", random_dfa(n, 2, seed)
+            yield f"random n={n} k=3 #{seed}", random_dfa(n, 3, seed)
+    for n in (5, 8, 11, 14, 20):
+        yield f"remainder n={n}", remainder_dfa(n)
+    for n in (10, 30):
+        yield f"ring n={n}", ring_dfa(n)
+        yield f"chain n={n}", chain_dfa(n)
+
+
+def main():
+    orders = sorted(ELIMINATION_ORDERS)
+    totals = {order: [0, 0.0] for order in orders}
+
+    print(f"{'dfa':<22}" + ''.join(f"{order:>24}" for order in orders))
+    for name, data in corpus():
+        row = f"{name:<22}"
+        for order in orders:
+            dfa = dfa_from_json(prune_automaton(data, prune_dead=True))
+            start = time.perf_counter()
+            try:
+                length = len(gen_regex(dfa, MAX_SIZE, order))
+            except RegexTooLarge:
+                length = None
+            elapsed = time.perf_counter() - start
+            totals[order][1] += elapsed
+            if length is None:
+                row += f"{'too large':>13} {elapsed:>9.4f}s"
+            else:
+                totals[order][0] += length
+                row += f"{length:>13} {elapsed:>9.4f}s"
+        print(row)
+
+    print(f"{'total':<22}" + ''.join(f"{totals[order][0]:>13} {totals[order][1]:>9.4f}s" for order in orders))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import random
+import sys
+import time
+
+CODES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'codes')
+sys.path.insert(0, CODES)
+
+from automata.regex import NFABuilder, build_NFA, parse, tokenize
+
+
+def keyword_alternation(length, seed=0):
+    # (kw1+kw2+...+kwn)* style pattern of roughly the given length
+    rng = random.Random(seed)
+    keywords = []
+    size = 3
+    while size < length:
+        keyword = ''.join(rng.choice('abcdefgh')
+                          for _ in range(rng.randint(3, 10)))
+        keywords.append(keyword)
+        size += len(keyword) + 1
+    return '(' + '+'.join(keywords) + ')*'
+
+
+def timed(f, *args):
+    start = time.perf_counter()
+    result = f(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print(f"{'length':>10} {'tokenize':>10} {'parse':>10} {'build':>10} {'states':>10}")
+    for exponent in range(3, 7):
+        regex = keyword_alternation(10 ** exponent)
+        tokens, t_tokenize = timed(tokenize, regex)
+        tree, t_parse = timed(parse, tokens)
+        N = NFABuilder()
+        _, t_build = timed(build_NFA, N, tree)
+        print(f"{len(regex):>10} {t_tokenize:>10.4f} {t_parse:>10.4f} {t_build:>10.4f} {N.state_count:>10}")
+
+
+if __name__ == "__main__":
+    main()
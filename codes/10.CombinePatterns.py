@@ -0,0 +1,57 @@
+import argparse
+from functools import reduce
+
+from automata.binary import open_DFA, write_automaton
+from automata.matcher import CompiledDFA
+from automata.product import OPERATIONS, combine, combine_patterns, complement
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python3 10.CombinePatterns.py dfafile [dfafile ...] outfile (--op OPERATION | --match STRINGS) [--compact] [--binary]")
+    parser.add_argument('dfafiles', nargs='+', metavar='dfafile')
+    parser.add_argument('outfile')
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--op', choices=sorted(OPERATIONS) + ['complement'],
+                      help="write the minimal DFA for the intersection, union or difference of the DFAs, taken left to right, or for the complement of a single DFA")
+    mode.add_argument('--match', metavar='STRINGS',
+                      help="match every line of STRINGS against all the DFAs at once and write which of them accept it")
+    parser.add_argument('--compact', action='store_true',
+                        help="write the output DFA on one line without indentation")
+    parser.add_argument('--binary', action='store_true',
+                        help="write the output DFA in the binary format of 9.ConvertFormat.py")
+    args = parser.parse_args()
+    if args.op == 'complement' and len(args.dfafiles) != 1:
+        parser.error("--op complement takes a single DFA")
+
+    try:
+        dfas = [open_DFA(path) for path in args.dfafiles]
+    except:
+        print(
+            "Error reading input file. Please ensure it is present and correctly formatted")
+        exit()
+
+    if args.op == 'complement':
+        write_automaton(args.outfile, complement(dfas[0]), args.binary, args.compact)
+        return
+    if args.op is not None:
+        dfa = reduce(lambda a, b: combine(a, b, args.op), dfas)
+        write_automaton(args.outfile, dfa, args.binary, args.compact)
+        return
+
+    dfa, matches = combine_patterns(dfas)
+    matcher = CompiledDFA(dfa)
+    print(f"combined DFA: {dfa.n_states} states")
+
+    with open(args.match) as f:
+        strings = [line.rstrip('\n') for line in f]
+
+    with open(args.outfile, 'w+') as f:
+        for string in strings:
+            s = matcher.run(string)
+            matched = matches[s] if s != matcher.dead else ()
+            f.write(" ".join(str(i + 1) for i in matched) + "\n" if matched else "none\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import json
+import sys
+
+from automata.equivalence import (accepts, equivalence_counterexample,
+                                  inclusion_counterexample, load_language)
+from automata.regex import MalformedRegex
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python3 11.CheckEquivalence.py first second [--inclusion]")
+    parser.add_argument('first', help="the output of any of Q1 to Q4: a regex, an NFA or a DFA")
+    parser.add_argument('second')
+    parser.add_argument('--inclusion', action='store_true',
+                        help="only check that everything the first accepts the second accepts too")
+    args = parser.parse_args()
+
+    try:
+        first = load_language(args.first)
+        second = load_language(args.second)
+    except MalformedRegex:
+        print("ERROR: Malformed Regular Expression")
+        sys.exit(2)
+    except:
+        print(
+            "Error reading input file. Please ensure it is present and correctly formatted")
+        sys.exit(2)
+
+    if args.inclusion:
+        word = inclusion_counterexample(first, second)
+        if word is None:
+            print("included")
+            return
+        print(f"not included: {json.dumps(''.join(word))} is accepted by the first but not the second")
+    else:
+        word = equivalence_counterexample(first, second)
+        if word is None:
+            print("equivalent")
+            return
+        only = 'first' if accepts(first, word) else 'second'
+        print(f"not equivalent: {json.dumps(''.join(word))} is only accepted by the {only}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,132 +1,80 @@
-import json
-import sys
+import argparse
+from functools import partial
 
+from automata.batch import batch_main
+from automata.binary import is_binary, open_DFA
+from automata.cache import add_cache_arguments, cached, canonical_automaton, report
+from automata.dfa import dfa_from_json
+from automata.dfa2regex import ELIMINATION_ORDERS, RegexTooLarge, gen_regex
+from automata.jsonio import read_json, write_json
+from automata.reachability import prune_DFA, prune_automaton
 
-class DFA:
-    def __init__(self, states, alphabet, transitions, start_states, accept_states):
-        self.states = states
-        self.alphabet = sorted(alphabet)
 
-        self.transitions = {}
-        for state in self.states:
-            self.transitions[state] = {}
+def DFA_from_data(dfa_data):
+    # Unreachable and dead states never contribute to the regex
+    return dfa_from_json(prune_automaton(dfa_data, prune_dead=True))
 
-        for transition in transitions:
-            self.transitions[transition[0]][transition[1]] = transition[2]
 
-        self.init_states = start_states
+def convert(record, max_size=None, order='reverse'):
+    return {'regex': gen_regex(DFA_from_data(record), max_size, order)}
 
-        self.accept_states = sorted(accept_states)
 
-    def gen_regex(self):
-
-        A = [['' for _ in range(len(self.states))]
-             for _ in range(len(self.states))]
-        B = ['' for _ in range(len(self.states))]
-
-        for i in range(len(self.states)):
-            s = self.states[i]
-            if s in self.accept_states:
-                B[i] = '$'
-
-            for a in self.transitions[s]:
-                ns = self.transitions[s][a]
-                j = self.states.index(ns)
-                A[i][j] = a if A[i][j] == '' else self.union(A[i][j], a)
-
-        for n in range(len(self.states) - 1, -1, -1):
-            if A[n][n] != '':
-                B[n] = self.concat(self.kleen(A[n][n]), B[n])
-                for j in range(n):
-                    A[n][j] = self.concat(self.kleen(A[n][n]), A[n][j])
-
-            for i in range(n):
-                if A[i][n] != '':
-                    B[i] = self.union(B[i], self.concat(A[i][n], B[n]))
-                    for j in range(n):
-                        A[i][j] = self.union(
-                            A[i][j], self.concat(A[i][n], A[n][j]))
-
-        self.regex = B[0]
-
-    def kleen(self, r):
-        if r in ['', '$']:
-            return '$'
-        elif r in self.alphabet:
-            return f'{r}*'
-        elif r[0] == '(' and r[-1] == ')':
-            return f'{r}*'
-        else:
-            return f'({r})*'
-
-    def union(self, r1, r2):
-        if r1 == '' or r2 == '':
-            return r1 + r2
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python3 q3.py infile outfile [--max-size N] [--order ORDER] [--compact] [--stream] [--batch [--jobs N] [--timeout SECONDS]] [--cache PATH [--cache-size MB]]")
+    parser.add_argument('infile')
+    parser.add_argument('outfile')
+    parser.add_argument('--max-size', type=int, default=None,
+                        help="give up as soon as an intermediate expression is longer than N characters")
+    parser.add_argument('--order', choices=sorted(ELIMINATION_ORDERS), default='reverse',
+                        help="order in which the states are eliminated (default reverse)")
+    parser.add_argument('--compact', action='store_true',
+                        help="write the output on one line without indentation")
+    parser.add_argument('--stream', action='store_true',
+                        help="read the input transitions one at a time instead of loading the whole JSON document")
+    parser.add_argument('--batch', action='store_true',
+                        help="read one DFA per line and write one result per line (JSON Lines); - is stdin or stdout")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="with --batch, convert the records in N worker processes")
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="with --batch, give up on a record after SECONDS")
+    add_cache_arguments(parser)
+    args = parser.parse_args()
+    if args.stream and (args.batch or args.cache):
+        parser.error("--stream cannot be used with --batch or --cache")
+    if args.cache and not args.batch and is_binary(args.infile):
+        parser.error("--cache cannot be used with a binary input file")
+
+    convert_record = cached(args, 'dfa2regex',
+                            partial(convert, max_size=args.max_size, order=args.order),
+                            canonical_automaton)
+
+    if args.batch:
+        batch_main(convert_record, args.infile, args.outfile, args.jobs, args.timeout)
+        return
+
+    direct = args.stream or is_binary(args.infile)
+    try:
+        if direct:
+            dfa = prune_DFA(open_DFA(args.infile, stream=args.stream), prune_dead=True)
         else:
-            return f'({r1}+{r2})'
+            dfa_data = read_json(args.infile)
+    except:
+        print(
+            "Error reading input file. Please ensure it is present and correctly formatted")
+        exit()
 
-    def concat(self, r1, r2):
-        if r1 == '' or r2 == '':
-            return ''
-        elif r1 == '$' and r2 != '$':
-            return r2
-        elif r1 != '$' and r2 == '$':
-            return r1
-        elif r1 == '$' and r2 == '$':
-            return '$'
+    try:
+        if direct:
+            regex_data = {'regex': gen_regex(dfa, args.max_size, args.order)}
         else:
-            return f'{r1}{r2}'
-
-    def print_data(self):
-        print("==STATES==")
-        for state in self.states:
-            print(state)
-        print("==ALPHABET==")
-        for letter in self.alphabet:
-            print(letter)
-        print("==TRANSITIONS==")
-        for state in self.states:
-            for letter in self.transitions[state].keys():
-                ns = self.transitions[str(state)][letter]
-                print(
-                    f"{state if state != set() else '{}'}:{letter}>{ns if ns != set() else '{}' }")
-        print("==INITIAL STATE==")
-        for state in self.init_states:
-            print(state)
-        print("==ACCEPT STATES==")
-        for state in self.accept_states:
-            print(state)
-
-    def write_to_file(self):
-        regex_data = {'regex': self.regex}
-        with open(sys.argv[2], 'w+') as f:
-            json.dump(regex_data, f, indent=4)
-
-
-def read_DFA_from_file():
-    with open(sys.argv[1]) as f:
-        dfa_data = json.load(f)
-
-    # Put the init_state at the start of the list of states
-    init_state = dfa_data['start_states'][0]
-    dfa_data['states'] = list(
-        filter(lambda s: s != init_state, dfa_data['states']))
-    dfa_data['states'] = [init_state] + dfa_data['states']
-
-    dfa = DFA(dfa_data['states'], dfa_data['letters'], dfa_data['transition_function'],
-              dfa_data['start_states'], dfa_data['final_states'])
-
-    return dfa
-
-
-def main():
-    if len(sys.argv) != 3:
-        print("Usage: python3 q3.py infile outfile")
+            regex_data = convert_record(dfa_data)
+    except RegexTooLarge:
+        print(f"ERROR: Regular expression is longer than {args.max_size} characters")
         exit()
 
-    dfa = read_DFA_from_file()
-    dfa.gen_regex()
-    dfa.write_to_file()
+    write_json(args.outfile, regex_data, args.compact)
+    report(convert_record)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+import argparse
+
+from automata.binary import is_DFA_data, is_binary, read_binary, write_binary
+from automata.dfa import DFA, dfa_from_json
+from automata.jsonio import read_json, write_json
+from automata.nfa import nfa_from_json
+from automata.reachability import prune_automaton
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python3 5.PruneAutomaton.py infile outfile [--prune-dead] [--no-sink] [--binary]")
+    parser.add_argument('infile')
+    parser.add_argument('outfile')
+    parser.add_argument('--prune-dead', action='store_true',
+                        help="also remove the states from which no final state can be reached")
+    parser.add_argument('--no-sink', action='store_true',
+                        help="drop transitions into dead states instead of keeping a single dead sink")
+    parser.add_argument('--binary', action='store_true',
+                        help="write the output in the binary format of 9.ConvertFormat.py")
+    args = parser.parse_args()
+
+    binary_input = is_binary(args.infile)
+    try:
+        if binary_input:
+            automaton = read_binary(args.infile)
+            data = automaton.to_json()
+        else:
+            data = read_json(args.infile)
+    except:
+        print(
+            "Error reading input file. Please ensure it is present and correctly formatted")
+        exit()
+
+    data = prune_automaton(data, args.prune_dead, not args.no_sink)
+
+    if args.binary:
+        # A binary input stays the kind it was, a JSON one is stored as a
+        # DFA whenever it is deterministic
+        if isinstance(automaton, DFA) if binary_input else is_DFA_data(data):
+            write_binary(args.outfile, dfa_from_json(data))
+        else:
+            write_binary(args.outfile, nfa_from_json(data))
+    else:
+        write_json(args.outfile, data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import argparse
+
+from automata.binary import open_DFA
+from automata.matcher import CompiledDFA
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python3 6.DFAMatcher.py dfafile stringsfile outfile [--batch]")
+    parser.add_argument('dfafile')
+    parser.add_argument('stringsfile')
+    parser.add_argument('outfile')
+    parser.add_argument('--batch', action='store_true',
+                        help="step all inputs of the same length through the DFA together")
+    args = parser.parse_args()
+
+    try:
+        dfa = CompiledDFA(open_DFA(args.dfafile))
+    except:
+        print(
+            "Error reading input file. Please ensure it is present and correctly formatted")
+        exit()
+
+    with open(args.stringsfile) as f:
+        strings = [line.rstrip('\n') for line in f]
+
+    if args.batch:
+        results = dfa.match_batch(strings)
+    else:
+        results = dfa.match_all(strings)
+
+    with open(args.outfile, 'w+') as f:
+        for accepted in results:
+            f.write('accept\n' if accepted else 'reject\n')
+
+
+if __name__ == "__main__":
+    main()
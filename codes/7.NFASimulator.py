@@ -0,0 +1,70 @@
+import argparse
+import time
+
+from automata.binary import open_NFA
+from automata.lazy_dfa import LazyDFA
+from automata.nfa_simulation import NFASimulator
+
+
+def match_timed(matcher, strings):
+    results = []
+    for string in strings:
+        start = time.perf_counter()
+        accepted = matcher.match(string)
+        results.append((accepted, time.perf_counter() - start))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python3 7.NFASimulator.py nfafile stringsfile outfile [--timings] [--lazy-dfa [--cache-size N]]")
+    parser.add_argument('nfafile')
+    parser.add_argument('stringsfile')
+    parser.add_argument('outfile')
+    parser.add_argument('--timings', action='store_true',
+                        help="write the time taken by every input next to its result")
+    parser.add_argument('--lazy-dfa', action='store_true',
+                        help="determinise the NFA on the fly while matching, caching the DFA states")
+    parser.add_argument('--cache-size', type=int, default=1024,
+                        help="number of DFA states kept by --lazy-dfa (default 1024)")
+    args = parser.parse_args()
+
+    try:
+        nfa = open_NFA(args.nfafile)
+    except:
+        print(
+            "Error reading input file. Please ensure it is present and correctly formatted")
+        exit()
+
+    if args.lazy_dfa:
+        matcher = LazyDFA(nfa, args.cache_size)
+        simulator = matcher.simulator
+    else:
+        matcher = simulator = NFASimulator(nfa)
+
+    with open(args.stringsfile) as f:
+        strings = [line.rstrip('\n') for line in f]
+
+    results = match_timed(matcher, strings)
+
+    with open(args.outfile, 'w+') as f:
+        for accepted, seconds in results:
+            result = 'accept' if accepted else 'reject'
+            if args.timings:
+                f.write(f"{result} {seconds:.9f}\n")
+            else:
+                f.write(f"{result}\n")
+
+    if args.timings:
+        total = sum(seconds for _, seconds in results)
+        print(f"setup: {simulator.setup_time:.6f}s")
+        print(f"matching: {total:.6f}s for {len(results)} inputs "
+              f"({total / max(len(results), 1):.9f}s per input)")
+
+    if args.lazy_dfa:
+        stats = matcher.stats()
+        print(", ".join(f"{key}: {value}" for key, value in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
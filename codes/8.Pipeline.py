@@ -0,0 +1,80 @@
+import argparse
+
+from automata.dfa2regex import ELIMINATION_ORDERS, RegexTooLarge
+from automata.pipeline import INPUTS, STAGES, read_input, run_pipeline, stage_range, write_output
+from automata.regex import MalformedRegex
+
+
+def parse_save(value):
+    stage, _, path = value.partition('=')
+    if stage not in STAGES or not path:
+        raise argparse.ArgumentTypeError(
+            f"expected STAGE=PATH with STAGE one of {', '.join(STAGES)}")
+    return stage, path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python3 8.Pipeline.py infile [outfile] [--from INPUT] [--to STAGE] [--save STAGE=PATH ...] [--compact] [--binary]")
+    parser.add_argument('infile')
+    parser.add_argument('outfile', nargs='?',
+                        help="where to write the output of the last stage")
+    parser.add_argument('--from', dest='start', choices=INPUTS, default='regex',
+                        help="what the input file holds (default regex)")
+    parser.add_argument('--to', dest='end', choices=STAGES, default='regex',
+                        help="last stage to run (default regex)")
+    parser.add_argument('--save', type=parse_save, action='append', default=[],
+                        help="also write the output of an intermediate stage, e.g. --save dfa=dfa.json")
+    parser.add_argument('--table-filling', action='store_true',
+                        help="minimize with the table filling method instead of Hopcroft's algorithm")
+    parser.add_argument('--order', choices=sorted(ELIMINATION_ORDERS), default='reverse',
+                        help="order in which the states are eliminated (default reverse)")
+    parser.add_argument('--max-size', type=int, default=None,
+                        help="give up as soon as an intermediate expression is longer than N characters")
+    parser.add_argument('--compact', action='store_true',
+                        help="write the outputs on one line without indentation")
+    parser.add_argument('--binary', action='store_true',
+                        help="write the automata in the binary format of 9.ConvertFormat.py")
+    args = parser.parse_args()
+
+    try:
+        stages = stage_range(args.start, args.end)
+    except ValueError as e:
+        parser.error(str(e))
+
+    saves = dict(args.save)
+    if args.outfile is not None:
+        saves[args.end] = args.outfile
+    for stage in saves:
+        if stage not in stages:
+            parser.error(f"stage {stage} is not run when going from {args.start} to {args.end}")
+
+    try:
+        value = read_input(args.start, args.infile)
+    except:
+        print(
+            "Error reading input file. Please ensure it is present and correctly formatted")
+        exit()
+
+    def save(stage, output):
+        if stage in saves:
+            write_output(saves[stage], stage, output, args.compact, args.binary)
+
+    try:
+        _, timings = run_pipeline(value, args.start, args.end, save,
+                                  table_filling=args.table_filling,
+                                  order=args.order, max_size=args.max_size)
+    except MalformedRegex:
+        print("ERROR: Malformed Regular Expression")
+        exit()
+    except RegexTooLarge:
+        print(f"ERROR: Regular expression is longer than {args.max_size} characters")
+        exit()
+
+    for stage, seconds in timings:
+        print(f"{stage}: {seconds:.6f}s")
+    print(f"total: {sum(seconds for _, seconds in timings):.6f}s")
+
+
+if __name__ == "__main__":
+    main()
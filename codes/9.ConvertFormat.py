@@ -0,0 +1,42 @@
+import argparse
+
+from automata.binary import is_DFA_data, is_binary, read_binary, write_automaton, write_binary
+from automata.dfa import dfa_from_json
+from automata.jsonio import read_json
+from automata.nfa import nfa_from_json
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python3 9.ConvertFormat.py infile outfile [--nfa] [--compact]")
+    parser.add_argument('infile', help="a JSON automaton to convert to binary, or a binary one to convert to JSON")
+    parser.add_argument('outfile')
+    parser.add_argument('--nfa', action='store_true',
+                        help="store a JSON automaton as an NFA even if it is deterministic")
+    parser.add_argument('--compact', action='store_true',
+                        help="write JSON output on one line without indentation")
+    args = parser.parse_args()
+
+    binary_input = is_binary(args.infile)
+    try:
+        if binary_input:
+            automaton = read_binary(args.infile)
+        else:
+            data = read_json(args.infile)
+            if args.nfa or not is_DFA_data(data):
+                automaton = nfa_from_json(data)
+            else:
+                automaton = dfa_from_json(data)
+    except:
+        print(
+            "Error reading input file. Please ensure it is present and correctly formatted")
+        exit()
+
+    if binary_input:
+        write_automaton(args.outfile, automaton, compact=args.compact)
+    else:
+        write_binary(args.outfile, automaton)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from .alphabet import EPSILON, Alphabet, intern_alphabet
+from .reachability import prune_automaton, prune_DFA
+from .nfa import NFA, compute_ec, load_NFA_from_file, nfa_from_json
+from .dfa import DFA, dfa_from_json, load_DFA_from_file
+from .regex import MalformedRegex, regex_to_NFA
+from .determinize import determinize
+from .minimize import minimize
+from .dfa2regex import ELIMINATION_ORDERS, RegexTooLarge, gen_regex
+from .pipeline import run_pipeline
+from .matcher import CompiledDFA
+from .nfa_simulation import NFASimulator
+from .lazy_dfa import LazyDFA
+from .binary import open_DFA, open_NFA, read_binary, write_binary
+from .product import combine, combine_patterns, complement
+from .equivalence import equivalence_counterexample, inclusion_counterexample
@@ -0,0 +1,30 @@
+import sys
+
+# Label of the epsilon transitions of an NFA, '$' in the file formats
+EPSILON = -1
+
+_alphabets = {}
+
+
+class Alphabet:
+    __slots__ = ('letters', 'index')
+
+    def __init__(self, letters):
+        self.letters = tuple(sys.intern(letter) for letter in letters)
+        self.index = {letter: k for k, letter in enumerate(self.letters)}
+
+    def __len__(self):
+        return len(self.letters)
+
+    def __iter__(self):
+        return iter(self.letters)
+
+
+def intern_alphabet(letters):
+    # Automata over the same letters share one Alphabet object instead of
+    # each holding its own list and index
+    key = tuple(letters)
+    alphabet = _alphabets.get(key)
+    if alphabet is None:
+        alphabet = _alphabets[key] = Alphabet(key)
+    return alphabet
@@ -0,0 +1,191 @@
+import json
+import signal
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import stats_summary
+from .dfa2regex import RegexTooLarge
+from .regex import MalformedRegex
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class RecordTimeout(Exception):
+    pass
+
+
+def error_message(e):
+    if isinstance(e, UpstreamError):
+        return e.args[0]
+    elif isinstance(e, RecordTimeout):
+        return f"Timed out after {e.args[0]} seconds"
+    elif isinstance(e, MalformedRegex):
+        return "Malformed Regular Expression"
+    elif isinstance(e, RegexTooLarge):
+        return f"Regular expression is longer than {e.args[0]} characters"
+    elif isinstance(e, json.JSONDecodeError):
+        return "Record is not valid JSON"
+    else:
+        return "Record is not correctly formatted"
+
+
+def open_input(path):
+    return sys.stdin if path == '-' else open(path)
+
+
+def open_output(path):
+    return sys.stdout if path == '-' else open(path, 'w+')
+
+
+def read_chunks(fin, chunk_size):
+    # Lists of (line number, line) of the non-blank input lines
+    chunk = []
+    for line_no, line in enumerate(fin, 1):
+        if not line.strip():
+            continue
+        chunk.append((line_no, line))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def convert_line(convert, line_no, line):
+    # The output of another batch can be read back directly: its results
+    # are converted and its errors passed on, keeping the line numbers of
+    # the first input
+    origin = line_no
+    try:
+        record = json.loads(line)
+        if isinstance(record, dict) and ('result' in record or 'error' in record):
+            origin = record.get('line', line_no)
+            if 'error' in record:
+                raise UpstreamError(record['error'])
+            record = record['result']
+        return {'line': origin, 'result': convert(record)}
+    except Exception as e:
+        return {'line': origin, 'error': error_message(e)}
+
+
+def convert_chunk(convert, timeout, chunk):
+    # Runs in the worker processes, or in the main process without --jobs.
+    # The timeout is a SIGALRM interval timer, which interrupts the
+    # conversion wherever it is. Returns every output line with the time
+    # its record took, and the counters convert kept while at it, if any.
+    def expire(signum, frame):
+        raise RecordTimeout(timeout)
+
+    use_timer = timeout is not None and hasattr(signal, 'setitimer')
+    if use_timer:
+        previous = signal.signal(signal.SIGALRM, expire)
+
+    results = []
+    try:
+        for line_no, line in chunk:
+            start = time.perf_counter()
+            try:
+                if use_timer:
+                    signal.setitimer(signal.ITIMER_REAL, timeout)
+                try:
+                    result = convert_line(convert, line_no, line)
+                finally:
+                    if use_timer:
+                        signal.setitimer(signal.ITIMER_REAL, 0)
+            except RecordTimeout as e:
+                result = {'line': line_no, 'error': error_message(e)}
+            results.append((json.dumps(result), 'error' in result,
+                            time.perf_counter() - start))
+    finally:
+        if use_timer:
+            signal.signal(signal.SIGALRM, previous)
+
+    stats = convert.take_stats() if hasattr(convert, 'take_stats') else {}
+    return results, stats
+
+
+def converted_chunks(convert, chunks, jobs, timeout):
+    # Results of every chunk, in input order. With several jobs, at most
+    # two chunks per worker are in flight, so the input is read as the
+    # workers go rather than all at once.
+    if jobs <= 1:
+        for chunk in chunks:
+            yield convert_chunk(convert, timeout, chunk)
+        return
+
+    with ProcessPoolExecutor(jobs) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(convert_chunk, convert, timeout, chunk))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run_batch(convert, fin, outfile, jobs=1, timeout=None, chunk_size=None):
+    # JSON Lines in and out: every non-blank line of the open input fin is
+    # one record, and gets one output line, in the same order, holding
+    # either the result of convert or the reason it failed. A bad record
+    # never stops the batch. convert has to be picklable when jobs > 1.
+    # Records can take seconds each, so with several jobs they are handed
+    # to the workers one at a time by default, and even a short batch is
+    # spread over all of them. Returns the number of errors, the time every
+    # record took and the summed counters of convert.
+    if chunk_size is None:
+        chunk_size = 1 if jobs > 1 else 64
+    errors = 0
+    latencies = []
+    stats = Counter()
+
+    fout = open_output(outfile)
+    try:
+        for results, chunk_stats in converted_chunks(convert, read_chunks(fin, chunk_size),
+                                                     jobs, timeout):
+            for line, failed, seconds in results:
+                fout.write(line + '\n')
+                errors += failed
+                latencies.append(seconds)
+            stats.update(chunk_stats)
+            if fout is sys.stdout:
+                fout.flush()
+    finally:
+        if fout is not sys.stdout:
+            fout.close()
+
+    return errors, latencies, stats
+
+
+def percentile(values, p):
+    # Nearest rank, values sorted
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, -(-len(values) * p // 100) - 1))]
+
+
+def batch_main(convert, infile, outfile, jobs=1, timeout=None):
+    start = time.perf_counter()
+    try:
+        fin = open_input(infile)
+    except OSError:
+        print(
+            "Error reading input file. Please ensure it is present and correctly formatted")
+        exit()
+    try:
+        errors, latencies, stats = run_batch(convert, fin, outfile, jobs, timeout)
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} records, {errors} errors in {elapsed:.3f}s "
+          f"({len(latencies) / max(elapsed, 1e-9):.1f} records/s, "
+          f"p50 {percentile(latencies, 50) * 1000:.3f}ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.3f}ms)", file=sys.stderr)
+    if stats:
+        print(stats_summary(stats), file=sys.stderr)
@@ -0,0 +1,236 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from .alphabet import intern_alphabet
+from .dfa import DFA, load_DFA_from_file, sort_DFA
+from .jsonio import write_json_lists
+from .nfa import NFA, EdgeList, load_NFA_from_file, prune_NFA
+
+# Layout of a binary automaton file, all little endian:
+#
+#   header      magic, version, kind, flags and the counts below
+#   int32[]     NFA: offsets[n_states + 1], labels[n_transitions],
+#                    targets[n_transitions] (the CSR arrays of NFA)
+#               DFA: table[n_transitions] (n_states * n_letters, as DFA.table)
+#   int32[]     starts[n_starts], accepts[n_accepts]: state ids
+#   int32[]     string offsets[n_strings + 1] into the UTF-8 bytes that follow
+#   bytes       the letters, then the state names if HAS_NAMES is set
+#
+# Names that are not strings (the lists written by NFA2DFA and DFAMinimizer)
+# are stored as compact JSON and JSON_NAMES is set. The version is bumped
+# whenever the layout changes.
+MAGIC = b'TOCA'
+VERSION = 1
+HEADER = struct.Struct('<4sHBBiiiii')
+
+NFA_KIND = 0
+DFA_KIND = 1
+
+HAS_NAMES = 1
+JSON_NAMES = 2
+
+
+class BinaryFormatError(ValueError):
+    pass
+
+
+class StringTable:
+    __slots__ = ('offsets', 'blob', 'first', 'count', 'decode')
+
+    def __init__(self, offsets, blob, first, count, decode=None):
+        # Strings first .. first + count - 1 of the table, each decoded from
+        # the mapped file only when it is looked up
+        self.offsets = offsets
+        self.blob = blob
+        self.first = first
+        self.count = count
+        self.decode = decode
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        i += self.first
+        string = str(self.blob[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+        return string if self.decode is None else self.decode(string)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+
+def int32_bytes(values):
+    values = values if isinstance(values, array) else array('i', values)
+    if sys.byteorder == 'big':
+        values = array('i', values)
+        values.byteswap()
+    return values
+
+
+def is_binary(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_binary(path, automaton):
+    n = automaton.n_states
+    strings = [letter.encode() for letter in automaton.alphabet.letters]
+
+    flags = 0
+    if automaton.names is not None:
+        flags |= HAS_NAMES
+        names = list(automaton.names)
+        if all(isinstance(name, str) for name in names):
+            strings += [name.encode() for name in names]
+        else:
+            flags |= JSON_NAMES
+            strings += [json.dumps(name, separators=(',', ':')).encode() for name in names]
+
+    if isinstance(automaton, DFA):
+        kind = DFA_KIND
+        arrays = [automaton.table]
+        starts = [automaton.start]
+        accepts = [s for s in range(n) if automaton.accepts[s]]
+    else:
+        kind = NFA_KIND
+        arrays = [automaton.offsets, automaton.labels, automaton.targets]
+        starts = automaton.starts
+        accepts = automaton.accepts
+
+    string_offsets = array('i', [0])
+    for string in strings:
+        string_offsets.append(string_offsets[-1] + len(string))
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, kind, flags, n, len(automaton.alphabet),
+                            len(arrays[-1]), len(starts), len(accepts)))
+        for values in arrays + [starts, accepts, string_offsets]:
+            f.write(int32_bytes(values))
+        for string in strings:
+            f.write(string)
+
+
+def read_binary(path):
+    # The file is mapped into memory and the int32 arrays are used in place,
+    # so a DFA's table is never copied or parsed. An NFA is rebuilt from its
+    # arrays, which takes one pass over the transitions.
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(data) < HEADER.size or data[:len(MAGIC)] != MAGIC:
+        raise BinaryFormatError("Not a binary automaton file")
+    _, version, kind, flags, n, k, n_transitions, n_starts, n_accepts = \
+        HEADER.unpack_from(data)
+    if version != VERSION:
+        raise BinaryFormatError(f"Unsupported binary format version {version}")
+    if kind not in (NFA_KIND, DFA_KIND):
+        raise BinaryFormatError(f"Unknown automaton kind {kind}")
+
+    n_strings = k + (n if flags & HAS_NAMES else 0)
+    sizes = [n_transitions, n_starts, n_accepts, n_strings + 1]
+    if kind == NFA_KIND:
+        sizes = [n + 1, n_transitions] + sizes
+    if len(data) < HEADER.size + 4 * sum(sizes):
+        raise BinaryFormatError("Truncated binary automaton file")
+
+    view = memoryview(data)
+    pos = HEADER.size
+    arrays = []
+    for size in sizes:
+        values = view[pos:pos + 4 * size].cast('i')
+        if sys.byteorder == 'big':
+            values = array('i', values.tobytes())
+            values.byteswap()
+        arrays.append(values)
+        pos += 4 * size
+
+    *transitions, starts, accepts, string_offsets = arrays
+    blob = view[pos:]
+    if len(blob) < string_offsets[-1]:
+        raise BinaryFormatError("Truncated binary automaton file")
+
+    alphabet = intern_alphabet(StringTable(string_offsets, blob, 0, k))
+    names = None
+    if flags & HAS_NAMES:
+        names = StringTable(string_offsets, blob, k, n,
+                            json.loads if flags & JSON_NAMES else None)
+
+    if kind == DFA_KIND:
+        accept_flags = bytearray(n)
+        for s in accepts:
+            accept_flags[s] = 1
+        return DFA(alphabet, n, transitions[0], starts[0], accept_flags, names)
+
+    offsets, labels, targets = transitions
+    edges = EdgeList()
+    for s in range(n):
+        edges.sources.extend(array('i', [s]) * (offsets[s + 1] - offsets[s]))
+    edges.labels = array('i', labels)
+    edges.targets = array('i', targets)
+    return NFA(alphabet, n, edges, starts, accepts, names)
+
+
+def open_NFA(path, prune=False, stream=False):
+    # load_NFA_from_file for either format. A DFA file is read as the NFA
+    # it also is.
+    if not is_binary(path):
+        return load_NFA_from_file(path, prune, stream)
+
+    nfa = read_binary(path)
+    if isinstance(nfa, DFA):
+        edges = EdgeList()
+        k = len(nfa.alphabet)
+        for s in range(nfa.n_states):
+            for c in range(k):
+                t = nfa.table[s * k + c]
+                if t != -1:
+                    edges.append(s, c, t)
+        nfa = NFA(nfa.alphabet, nfa.n_states, edges, [nfa.start],
+                  [s for s in range(nfa.n_states) if nfa.accepts[s]], nfa.names)
+    return prune_NFA(nfa) if prune else nfa
+
+
+def open_DFA(path, sort_states=False, sort_letters=False, stream=False):
+    # load_DFA_from_file for either format
+    if not is_binary(path):
+        return load_DFA_from_file(path, sort_states, sort_letters, stream)
+
+    dfa = read_binary(path)
+    if not isinstance(dfa, DFA):
+        raise BinaryFormatError("Expected a DFA, found an NFA")
+    if sort_states or sort_letters:
+        dfa = sort_DFA(dfa, sort_states, sort_letters)
+    return dfa
+
+
+def is_DFA_data(data):
+    # Whether an automaton in the JSON format is deterministic: one start
+    # state, no epsilon transitions and at most one transition per state and
+    # letter. Regex2NFA writes $ only in the transitions, not in letters.
+    if len(data['start_states']) != 1:
+        return False
+    letters = set(data['letters'])
+    seen = set()
+    for s, a, _ in data['transition_function']:
+        if a not in letters or a == '$':
+            return False
+        key = (json.dumps(s), a)
+        if key in seen:
+            return False
+        seen.add(key)
+    return True
+
+
+def write_automaton(path, automaton, binary=False, compact=False):
+    if binary:
+        write_binary(path, automaton)
+    else:
+        write_json_lists(path, automaton.json_fields(), compact)
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from functools import partial
+
+from .regex import MalformedRegex, parse_regex, postfix
+
+# Part of every cache key. Bump it whenever a change makes any of the
+# programs write a different output for the same input, so that old
+# results are not served.
+TOOL_VERSION = 3
+
+# One connection per process and file. Worker processes must not reuse a
+# connection inherited through fork, hence the pid.
+_connections = {}
+
+
+def canonical_regex(record):
+    # Regex2NFA only depends on the syntax tree of the regex. A malformed
+    # regex is kept as it is: its conversion fails and is never stored.
+    try:
+        return {'postfix': postfix(parse_regex(record['regex']))}
+    except MalformedRegex:
+        return record['regex']
+
+
+def canonical_automaton(record, sort_states=False, sort_letters=False, sort_transitions=True):
+    # Only the parts of an automaton that can change the output of a
+    # program are kept in their order. Transitions are grouped by state
+    # and letter with a stable sort, so that when one is given twice the
+    # same one still comes last, and the final states are a set.
+    def key(name):
+        return json.dumps(name)
+
+    states = record['states']
+    letters = record['letters']
+    transitions = record['transition_function']
+    if sort_states:
+        states = sorted(states, key=key)
+    if sort_letters:
+        letters = sorted(letters)
+    if sort_transitions:
+        transitions = sorted(transitions, key=lambda t: (key(t[0]), t[1]))
+
+    return {
+        'states': states,
+        'letters': letters,
+        'transition_function': transitions,
+        'start_states': record['start_states'],
+        'final_states': sorted(record['final_states'], key=key)
+    }
+
+
+class ResultCache:
+    def __init__(self, path, max_bytes=256 * 2**20):
+        # Results are stored as JSON text in an SQLite file, with the time
+        # each one was last used. Once the stored results are larger than
+        # max_bytes, the least recently used ones are evicted.
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def connect(self):
+        key = (os.getpid(), self.path)
+        connection = _connections.get(key)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=60)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:
+                connection.executescript("""
+                    CREATE TABLE IF NOT EXISTS entries (
+                        key TEXT PRIMARY KEY, value TEXT NOT NULL,
+                        size INTEGER NOT NULL, used REAL NOT NULL);
+                    CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+                    CREATE TABLE IF NOT EXISTS total (bytes INTEGER NOT NULL);
+                    INSERT INTO total SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM total);
+                    CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries
+                    BEGIN UPDATE total SET bytes = bytes + new.size; END;
+                    CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries
+                    BEGIN UPDATE total SET bytes = bytes - old.size; END;
+                """)
+            _connections[key] = connection
+        return connection
+
+    def get(self, key):
+        connection = self.connect()
+        row = connection.execute(
+            "SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with connection:
+            connection.execute(
+                "UPDATE entries SET used = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, key, value):
+        connection = self.connect()
+        with connection:
+            connection.execute("INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)",
+                               (key, value, len(value), time.time()))
+            excess = connection.execute(
+                "SELECT bytes FROM total").fetchone()[0] - self.max_bytes
+            if excess <= 0:
+                return
+            evicted = []
+            for old_key, size in connection.execute(
+                    "SELECT key, size FROM entries ORDER BY used"):
+                evicted.append((old_key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            connection.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+    def wrap(self, tool, convert, canonical):
+        return CachedConverter(self, tool, convert, canonical)
+
+
+class CachedConverter:
+    def __init__(self, cache, tool, convert, canonical):
+        # The key of a record is a hash of the tool, its version, the
+        # options convert was given and the canonical form of the record.
+        # Only successful conversions are stored.
+        self.cache = cache
+        self.tool = tool
+        self.convert = convert
+        self.canonical = canonical
+        options = sorted(convert.keywords.items()) if isinstance(convert, partial) else []
+        self.prefix = json.dumps([tool, TOOL_VERSION, options])
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, record):
+        text = self.prefix + json.dumps(self.canonical(record), separators=(',', ':'))
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def __call__(self, record):
+        key = self.key(record)
+        value = self.cache.get(key)
+        if value is not None:
+            self.hits += 1
+            return json.loads(value)
+
+        self.misses += 1
+        result = self.convert(record)
+        self.cache.put(key, json.dumps(result, separators=(',', ':')))
+        return result
+
+    def take_stats(self):
+        stats = {'cache hits': self.hits, 'cache misses': self.misses}
+        self.hits = self.misses = 0
+        return stats
+
+
+def stats_summary(stats):
+    hits = stats.get('cache hits', 0)
+    misses = stats.get('cache misses', 0)
+    return (f"cache: {hits} hits, {misses} misses "
+            f"({100 * hits / max(hits + misses, 1):.1f}% hit rate)")
+
+
+def add_cache_arguments(parser):
+    parser.add_argument('--cache', metavar='PATH', default=None,
+                        help="reuse the results stored in this SQLite file and store new ones in it")
+    parser.add_argument('--cache-size', metavar='MB', type=int, default=256,
+                        help="evict the least recently used results beyond this size (default 256)")
+
+
+def cached(args, tool, convert, canonical):
+    if args.cache is None:
+        return convert
+    return ResultCache(args.cache, args.cache_size * 2**20).wrap(tool, convert, canonical)
+
+
+def report(convert):
+    if isinstance(convert, CachedConverter):
+        print(stats_summary(convert.take_stats()))
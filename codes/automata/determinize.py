@@ -0,0 +1,162 @@
+from array import array
+
+from .alphabet import EPSILON
+from .dfa import DFA
+from .letter_classes import expand_table, letter_classes
+from .nfa import compute_ec
+
+
+class SubsetTable:
+    def __init__(self, nfa):
+        # Bit i of a subset mask stands for NFA state i. rank[i] is the
+        # position of the name of state i in sorted order, which is the
+        # order the output format lists the members of a subset in.
+        self.nfa = nfa
+        self.names = [nfa.state_name(s) for s in range(nfa.n_states)]
+        order = sorted(range(nfa.n_states), key=self.names.__getitem__)
+        self.rank = [0] * nfa.n_states
+        for position, s in enumerate(order):
+            self.rank[s] = position
+        self.masks = []
+        self.ids = {}
+
+    def intern(self, mask):
+        if mask not in self.ids:
+            self.ids[mask] = len(self.masks)
+            self.masks.append(mask)
+        return self.ids[mask]
+
+    def size(self):
+        return len(self.masks)
+
+    def to_names(self, mask):
+        members = []
+        while mask:
+            low = mask & -mask
+            members.append(low.bit_length() - 1)
+            mask ^= low
+        members.sort(key=self.rank.__getitem__)
+        return [self.names[s] for s in members]
+
+
+def gen_DFA_states(subsets):
+
+    # Every subset of the NFA states, enumerated in the order the power set
+    # always was
+    for mask in range(2**subsets.nfa.n_states):
+        subsets.intern(mask)
+
+
+def compute_step_masks(nfa, ec_masks):
+
+    # step[i][k] is the epsilon closed set of states reachable from NFA
+    # state i by $* alphabet[k] $*, so moving a whole subset is an OR of
+    # the step masks of its members
+    step = []
+    for s in range(nfa.n_states):
+        row = [0] * len(nfa.alphabet)
+        ec1 = ec_masks[s]
+        while ec1:
+            low = ec1 & -ec1
+            for label, t in nfa.edges(low.bit_length() - 1):
+                if label != EPSILON:
+                    row[label] |= ec_masks[t]
+            ec1 ^= low
+        step.append(row)
+
+    return step
+
+
+def compress_step_masks(nfa, step):
+
+    # Letters with the same step mask on every state move every subset the
+    # same way, so the subsets only need to be moved on one letter per
+    # class, and the other letters of a class take the same transitions
+    k = len(nfa.alphabet)
+    classes = letter_classes(tuple(row[c] for row in step) for c in range(k))
+    if len(classes) < k:
+        step = [[row[members[0]] for members in classes] for row in step]
+    return step, classes
+
+
+def move(dfa_state, k, step):
+
+    next_state = 0
+    while dfa_state:
+        low = dfa_state & -dfa_state
+        next_state |= step[low.bit_length() - 1][k]
+        dfa_state ^= low
+
+    return next_state
+
+
+def compute_init_state(nfa, ec_masks):
+
+    init_state = 0
+    for s in nfa.starts:
+        init_state |= ec_masks[s]
+
+    return init_state
+
+
+def compute_accepts(nfa, subsets):
+
+    accept_mask = 0
+    for s in nfa.accepts:
+        accept_mask |= 1 << s
+
+    return bytearray(1 if mask & accept_mask else 0 for mask in subsets.masks)
+
+
+def subset_DFA(nfa, subsets, table, init_state, classes):
+
+    names = [subsets.to_names(mask) for mask in subsets.masks]
+    table = expand_table(table, subsets.size(), classes, len(nfa.alphabet))
+    return DFA(nfa.alphabet, subsets.size(), table, init_state,
+               compute_accepts(nfa, subsets), names)
+
+
+def construct_DFA(nfa, subsets):
+
+    ec_masks = compute_ec(nfa)
+    step, classes = compress_step_masks(nfa, compute_step_masks(nfa, ec_masks))
+    k = len(classes)
+
+    table = array('i')
+    for state_id in range(subsets.size()):
+        dfa_state = subsets.masks[state_id]
+        table.extend(subsets.intern(move(dfa_state, c, step)) for c in range(k))
+
+    init_state = subsets.intern(compute_init_state(nfa, ec_masks))
+
+    return subset_DFA(nfa, subsets, table, init_state, classes)
+
+
+def construct_reachable_DFA(nfa, subsets):
+
+    ec_masks = compute_ec(nfa)
+    step, classes = compress_step_masks(nfa, compute_step_masks(nfa, ec_masks))
+    k = len(classes)
+
+    # Worklist subset construction: only subsets reachable from the
+    # epsilon closure of the start states are ever built. Every interned
+    # subset id past the one being expanded is still on the worklist.
+    init_state = subsets.intern(compute_init_state(nfa, ec_masks))
+
+    table = array('i')
+    state_id = 0
+    while state_id < subsets.size():
+        dfa_state = subsets.masks[state_id]
+        table.extend(subsets.intern(move(dfa_state, c, step)) for c in range(k))
+        state_id += 1
+
+    return subset_DFA(nfa, subsets, table, init_state, classes)
+
+
+def determinize(nfa, exhaustive=False):
+
+    subsets = SubsetTable(nfa)
+    if exhaustive:
+        gen_DFA_states(subsets)
+        return construct_DFA(nfa, subsets)
+    return construct_reachable_DFA(nfa, subsets)
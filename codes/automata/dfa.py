@@ -0,0 +1,130 @@
+from array import array
+
+from .alphabet import intern_alphabet
+from .jsonio import compact_names, json_events, read_json, read_json_stream, state_key
+
+
+class DFA:
+    __slots__ = ('alphabet', 'n_states', 'names', 'table', 'start', 'accepts')
+
+    def __init__(self, alphabet, n_states, table, start, accepts, names=None):
+        # table[s * len(alphabet) + k] is the state reached from s on letter
+        # k, or -1 if there is no such transition. accepts[s] is 1 for the
+        # final states. names is None when the states are q0, q1, ...
+        self.alphabet = alphabet
+        self.n_states = n_states
+        self.table = table
+        self.start = start
+        self.accepts = accepts
+        self.names = names
+
+    def state_name(self, s):
+        return f"q{s}" if self.names is None else self.names[s]
+
+    def next_state(self, s, k):
+        return self.table[s * len(self.alphabet) + k]
+
+    def is_complete(self):
+        return -1 not in self.table
+
+    def json_fields(self):
+        # The members of to_json() as (key, iterable) pairs, with the
+        # transitions generated as they are written
+        names = [self.state_name(s) for s in range(self.n_states)]
+        width = len(self.alphabet)
+
+        def transitions():
+            for s in range(self.n_states):
+                for k, letter in enumerate(self.alphabet.letters):
+                    t = self.table[s * width + k]
+                    if t != -1:
+                        yield [names[s], letter, names[t]]
+
+        return [('states', names),
+                ('letters', self.alphabet.letters),
+                ('transition_function', transitions()),
+                ('start_states', [names[self.start]]),
+                ('final_states', (names[s] for s in range(self.n_states) if self.accepts[s]))]
+
+    def to_json(self):
+        return {key: list(items) for key, items in self.json_fields()}
+
+    def print_data(self):
+        print("==STATES==")
+        for s in range(self.n_states):
+            print(self.state_name(s))
+        print("==ALPHABET==")
+        for letter in self.alphabet:
+            print(letter)
+        print("==TRANSITIONS==")
+        for s in range(self.n_states):
+            for k, letter in enumerate(self.alphabet.letters):
+                t = self.next_state(s, k)
+                if t != -1:
+                    print(f"{self.state_name(s)}:{letter}>{self.state_name(t)}")
+        print("==INITIAL STATE==")
+        print(self.state_name(self.start))
+        print("==ACCEPT STATES==")
+        for s in range(self.n_states):
+            if self.accepts[s]:
+                print(self.state_name(s))
+
+
+def dfa_from_events(events, sort_states=False, sort_letters=False):
+    # Builds a DFA from the (key, value) pairs of read_json_stream, filling
+    # the table one transition at a time. Transitions that come before the
+    # states and letters in the file are held back until those are known.
+    data = {}
+    table = None
+    pending = []
+
+    def add(transition):
+        s, a, ns = transition
+        table[state_index[state_key(s)] * width + alphabet.index[a]] = \
+            state_index[state_key(ns)]
+
+    for key, value in events:
+        if key != 'transition_function':
+            data[key] = value
+            if table is None and 'states' in data and 'letters' in data:
+                states = sorted(data['states']) if sort_states else data['states']
+                letters = sorted(data['letters']) if sort_letters else data['letters']
+                alphabet = intern_alphabet(letters)
+                state_index = {state_key(state): i for i, state in enumerate(states)}
+                width = len(alphabet)
+                table = array('i', [-1]) * (len(state_index) * width)
+        elif table is None:
+            pending.append(value)
+        else:
+            add(value)
+
+    for transition in pending:
+        add(transition)
+
+    n = len(state_index)
+    accepts = bytearray(n)
+    for state in data['final_states']:
+        accepts[state_index[state_key(state)]] = 1
+
+    return DFA(alphabet, n, table, state_index[state_key(data['start_states'][0])],
+               accepts, compact_names(states))
+
+
+def dfa_from_json(dfa_data, sort_states=False, sort_letters=False):
+    return dfa_from_events(json_events(dfa_data, ('transition_function',)),
+                           sort_states, sort_letters)
+
+
+def sort_DFA(dfa, sort_states=False, sort_letters=False):
+    # The DFA dfa_from_json would build from the JSON of this one
+    return dfa_from_events(json_events(dict(dfa.json_fields()), ('transition_function',)),
+                           sort_states, sort_letters)
+
+
+def load_DFA_from_file(path, sort_states=False, sort_letters=False, stream=False):
+    # With stream the file is never loaded whole, see read_json_stream
+    if stream:
+        events = read_json_stream(path, ('transition_function',))
+    else:
+        events = json_events(read_json(path), ('transition_function',))
+    return dfa_from_events(events, sort_states, sort_letters)
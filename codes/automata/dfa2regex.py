@@ -0,0 +1,307 @@
+import heapq
+
+from .letter_classes import compress_DFA
+from .reachability import strongly_connected_components
+
+
+EMPTY = 0
+EPSILON = 1
+
+
+class RegexTooLarge(Exception):
+    pass
+
+
+class RegexDAG:
+    def __init__(self, max_size=None):
+        # Hash-consed expression nodes: equal subexpressions get the same id,
+        # so they are shared instead of copied and comparing two
+        # expressions is comparing two ints. Node 0 is the empty language
+        # and node 1 is epsilon. size[x] is the length of the rendered
+        # expression, which is known without rendering it.
+        self.nodes = [('empty',), ('epsilon',)]
+        self.size = [0, 1]
+        self.ids = {}
+        self.max_size = max_size
+
+    def node(self, key, size):
+        x = self.ids.get(key)
+        if x is None:
+            if self.max_size is not None and size > self.max_size:
+                raise RegexTooLarge(self.max_size)
+            x = len(self.nodes)
+            self.ids[key] = x
+            self.nodes.append(key)
+            self.size.append(size)
+        return x
+
+    def symbol(self, a):
+        return self.node(('sym', a), len(a))
+
+    def kleen(self, r):
+        if r in (EMPTY, EPSILON):
+            return EPSILON
+        kind = self.nodes[r][0]
+        if kind == '*':
+            return r
+        elif kind in ('sym', '+'):
+            return self.node(('*', r), self.size[r] + 1)
+        else:
+            return self.node(('*', r), self.size[r] + 3)
+
+    def union(self, r1, r2):
+        if r1 == EMPTY or r1 == r2:
+            return r2
+        elif r2 == EMPTY:
+            return r1
+        elif r1 == EPSILON and self.nodes[r2][0] == '*':
+            return r2
+        elif r2 == EPSILON and self.nodes[r1][0] == '*':
+            return r1
+        else:
+            return self.node(('+', r1, r2), self.size[r1] + self.size[r2] + 3)
+
+    def concat(self, r1, r2):
+        if r1 == EMPTY or r2 == EMPTY:
+            return EMPTY
+        elif r1 == EPSILON:
+            return r2
+        elif r2 == EPSILON:
+            return r1
+        else:
+            return self.node(('.', r1, r2), self.size[r1] + self.size[r2])
+
+    def render(self, r):
+        # Each distinct node reachable from r is rendered once, bottom up
+        # with an explicit stack, and reused wherever it is shared
+        rendered = {EMPTY: '', EPSILON: '$'}
+        work = [r]
+        while work:
+            x = work[-1]
+            if x in rendered:
+                work.pop()
+                continue
+            node = self.nodes[x]
+            children = [child for child in node[1:] if child not in rendered] \
+                if node[0] != 'sym' else []
+            if children:
+                work.extend(children)
+                continue
+            work.pop()
+            if node[0] == 'sym':
+                rendered[x] = node[1]
+            elif node[0] == '+':
+                rendered[x] = f'({rendered[node[1]]}+{rendered[node[2]]})'
+            elif node[0] == '.':
+                rendered[x] = rendered[node[1]] + rendered[node[2]]
+            elif self.nodes[node[1]][0] in ('sym', '+'):
+                rendered[x] = f'{rendered[node[1]]}*'
+            else:
+                rendered[x] = f'({rendered[node[1]]})*'
+        return rendered[r]
+
+
+class EliminationGraph:
+    def __init__(self, n_states, E):
+        # Sparse form of the A matrix of Brzozowski's method: only the
+        # non-empty cells are stored, by row in out_edges and by column in
+        # in_edges. B[i] is the expression of the paths from state i that
+        # end in a final state.
+        self.E = E
+        self.out_edges = [{} for _ in range(n_states)]
+        self.in_edges = [{} for _ in range(n_states)]
+        self.B = [EMPTY for _ in range(n_states)]
+        self.remaining = [True] * n_states
+
+    def get(self, i, j):
+        return self.out_edges[i].get(j, EMPTY)
+
+    def set(self, i, j, r):
+        if r == EMPTY:
+            self.out_edges[i].pop(j, None)
+            self.in_edges[j].pop(i, None)
+        else:
+            self.out_edges[i][j] = r
+            self.in_edges[j][i] = r
+
+    def eliminate(self, n):
+        # Arden's rule on the self loop of n, then substitute n into every
+        # state that has an edge into it. Returns the neighbours of n,
+        # whose edges have changed.
+        E = self.E
+        B = self.B
+        self.remaining[n] = False
+
+        loop = self.get(n, n)
+        self.set(n, n, EMPTY)
+        if loop != EMPTY:
+            B[n] = E.concat(E.kleen(loop), B[n])
+            for j in sorted(self.out_edges[n]):
+                self.set(n, j, E.concat(E.kleen(loop), self.out_edges[n][j]))
+
+        ins = sorted(self.in_edges[n])
+        outs = sorted(self.out_edges[n])
+        for i in ins:
+            a = self.out_edges[i][n]
+            B[i] = E.union(B[i], E.concat(a, B[n]))
+            for j in outs:
+                self.set(i, j, E.union(
+                    self.get(i, j), E.concat(a, self.out_edges[n][j])))
+
+        for i in ins:
+            self.set(i, n, EMPTY)
+        for j in outs:
+            self.set(n, j, EMPTY)
+
+        return ins + outs
+
+
+class ReverseOrder:
+    # Highest index first, the order Brzozowski's method solves the
+    # equations in
+    def __init__(self, graph):
+        self.graph = graph
+        self.next = len(graph.remaining) - 1
+
+    def pick(self):
+        while not self.graph.remaining[self.next]:
+            self.next -= 1
+        return self.next
+
+    def update(self, states):
+        pass
+
+
+class ScoredOrder:
+    # Always the remaining state with the lowest score, lowest id on ties.
+    # Only the neighbours of an eliminated state change score, so scores
+    # live in a heap and stale entries are skipped when popped.
+    def __init__(self, graph):
+        self.graph = graph
+        self.scores = [None] * len(graph.remaining)
+        self.heap = []
+        self.update(range(len(graph.remaining)))
+
+    def pick(self):
+        while True:
+            score, n = heapq.heappop(self.heap)
+            if self.graph.remaining[n] and self.scores[n] == score:
+                return n
+
+    def update(self, states):
+        for n in states:
+            if n != 0 and self.graph.remaining[n]:
+                self.scores[n] = self.score(n)
+                heapq.heappush(self.heap, (self.scores[n], n))
+
+
+def degrees(graph, n):
+    ins = len(graph.in_edges[n]) - (n in graph.in_edges[n])
+    outs = len(graph.out_edges[n]) - (n in graph.out_edges[n])
+    return ins, outs
+
+
+class MinDegreeOrder(ScoredOrder):
+    # Fewest new entries: in-degree times out-degree
+    def score(self, n):
+        ins, outs = degrees(self.graph, n)
+        return ins * (outs + (self.graph.B[n] != EMPTY))
+
+
+def state_weight(graph, n):
+    # Total length the expressions around n gain when it is eliminated:
+    # every incoming expression is copied once per outgoing one (the final
+    # expression B[n] counts as outgoing) and the other way round, and the
+    # self loop is copied into every new entry
+    size = graph.E.size
+    in_sizes = [size[r] for i, r in graph.in_edges[n].items() if i != n]
+    out_sizes = [size[r] for j, r in graph.out_edges[n].items() if j != n]
+    if graph.B[n] != EMPTY:
+        out_sizes.append(size[graph.B[n]])
+
+    weight = sum(in_sizes) * (len(out_sizes) - 1) + \
+        sum(out_sizes) * (len(in_sizes) - 1)
+    loop = graph.get(n, n)
+    if loop != EMPTY:
+        weight += size[loop] * (len(in_sizes) * len(out_sizes) - 1)
+    return weight
+
+
+class MinWeightOrder(ScoredOrder):
+    def score(self, n):
+        return state_weight(self.graph, n)
+
+
+class SCCOrder(ScoredOrder):
+    # States that are not on any cycle can be eliminated without creating
+    # a star, so those go first, then the states inside strongly connected
+    # components; ties are broken by weight
+    def __init__(self, graph):
+        n_states = len(graph.remaining)
+        successors = [list(graph.out_edges[i]) for i in range(n_states)]
+        component, components = strongly_connected_components(successors)
+        self.cyclic = [len(components[component[n]]) > 1 or n in graph.out_edges[n]
+                       for n in range(n_states)]
+        super().__init__(graph)
+
+    def score(self, n):
+        return (self.cyclic[n], state_weight(self.graph, n))
+
+
+ELIMINATION_ORDERS = {
+    'reverse': ReverseOrder,
+    'min-degree': MinDegreeOrder,
+    'min-weight': MinWeightOrder,
+    'scc': SCCOrder
+}
+
+
+def gen_regex(dfa, max_size=None, order='reverse'):
+
+    # Dense state ids for the elimination: the initial state is 0 and the
+    # others follow in their order in the DFA
+    index = [0] * dfa.n_states
+    next_id = 1
+    for s in range(dfa.n_states):
+        if s != dfa.start:
+            index[s] = next_id
+            next_id += 1
+
+    E = RegexDAG(max_size)
+    n_states = dfa.n_states
+    graph = EliminationGraph(n_states, E)
+
+    # Letters with the same column are one class, labelled once with the
+    # union of its letters
+    compressed, classes = compress_DFA(dfa)
+    k = len(classes)
+    labels = []
+    for members in classes:
+        label = EMPTY
+        for letter in members:
+            label = E.union(label, E.symbol(dfa.alphabet.letters[letter]))
+        labels.append(label)
+
+    for s in range(n_states):
+        i = index[s]
+        if dfa.accepts[s]:
+            graph.B[i] = EPSILON
+
+        for c in range(k):
+            t = compressed.table[s * k + c]
+            if t != -1:
+                j = index[t]
+                graph.set(i, j, E.union(graph.get(i, j), labels[c]))
+
+    # The initial state is always the last one to be eliminated, its
+    # expression is the answer
+    strategy = ELIMINATION_ORDERS[order](graph)
+
+    for _ in range(n_states - 1):
+        n = strategy.pick()
+        strategy.update(graph.eliminate(n))
+
+    if n_states:
+        graph.B[0] = E.concat(E.kleen(graph.get(0, 0)), graph.B[0])
+
+    return E.render(graph.B[0])
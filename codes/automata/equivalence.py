@@ -0,0 +1,124 @@
+from .alphabet import intern_alphabet
+from .binary import is_DFA_data, is_binary, read_binary
+from .dfa import DFA, dfa_from_json
+from .jsonio import read_json
+from .matcher import CompiledDFA
+from .minimize import DisjointSet
+from .nfa import NFA, nfa_from_json
+from .nfa_simulation import NFASimulator
+from .regex import regex_to_NFA
+
+# Both checks walk two automata side by side through anything with a start
+# state, move(state, letter) and accepts(state): a CompiledDFA, or an
+# NFASimulator, whose states are sets of NFA states computed only when they
+# are reached, which is a lazy subset construction. Letters that an
+# automaton does not have lead to a state that never accepts.
+
+
+def stepper(automaton):
+    if isinstance(automaton, DFA):
+        return CompiledDFA(automaton)
+    return NFASimulator(automaton)
+
+
+def letters_of(*automata):
+    return sorted(set().union(*(automaton.alphabet.letters for automaton in automata)))
+
+
+def accepts(automaton, word):
+    walker = stepper(automaton)
+    state = walker.start
+    for letter in word:
+        state = walker.move(state, letter)
+    return walker.accepts(state)
+
+
+def path_to(pairs, i):
+    # pairs[i] is (state, state, index of the pair it was reached from,
+    # letter it was reached on)
+    word = []
+    while pairs[i][2] != -1:
+        word.append(pairs[i][3])
+        i = pairs[i][2]
+    return word[::-1]
+
+
+def equivalence_counterexample(a, b):
+    # Hopcroft and Karp: starting from the pair of start states, pairs of
+    # states that must be equivalent are merged in a union-find, and a pair
+    # whose states are already in the same set is never explored again, so
+    # every state is expanded at most once. The pairs are explored breadth
+    # first, which makes the first pair found to disagree on acceptance the
+    # end of a shortest string accepted by only one of a and b. Returns that
+    # string as a list of letters, or None if a and b are equivalent.
+    letters = letters_of(a, b)
+    a, b = stepper(a), stepper(b)
+
+    ids = {}
+    sets = DisjointSet(0)
+
+    def node(side, state):
+        i = ids.get((side, state))
+        if i is None:
+            i = ids[(side, state)] = sets.add()
+        return i
+
+    sets.union(node(0, a.start), node(1, b.start))
+    pairs = [(a.start, b.start, -1, None)]
+    head = 0
+    while head < len(pairs):
+        p, q, _, _ = pairs[head]
+        if a.accepts(p) != b.accepts(q):
+            return path_to(pairs, head)
+        for letter in letters:
+            next_p = a.move(p, letter)
+            next_q = b.move(q, letter)
+            x = sets.find(node(0, next_p))
+            y = sets.find(node(1, next_q))
+            if x != y:
+                sets.union(x, y)
+                pairs.append((next_p, next_q, head, letter))
+        head += 1
+
+    return None
+
+
+def inclusion_counterexample(a, b):
+    # Inclusion is not symmetric, so pairs cannot be merged: every reachable
+    # pair is visited once, breadth first. Returns a shortest string that a
+    # accepts and b rejects, as a list of letters, or None if everything a
+    # accepts b accepts too.
+    letters = letters_of(a, b)
+    a, b = stepper(a), stepper(b)
+
+    seen = {(a.start, b.start)}
+    pairs = [(a.start, b.start, -1, None)]
+    head = 0
+    while head < len(pairs):
+        p, q, _, _ = pairs[head]
+        if a.accepts(p) and not b.accepts(q):
+            return path_to(pairs, head)
+        for letter in letters:
+            pair = (a.move(p, letter), b.move(q, letter))
+            if pair not in seen:
+                seen.add(pair)
+                pairs.append(pair + (head, letter))
+        head += 1
+
+    return None
+
+
+def load_language(path):
+    # The output of any of the numbered programs: a regex, an NFA or a DFA,
+    # in JSON or binary. Deterministic automata are read as DFAs. The empty
+    # regex is what DFA2Regex writes for the empty language.
+    if is_binary(path):
+        return read_binary(path)
+    data = read_json(path)
+    if 'regex' in data:
+        if data['regex'] == '':
+            return NFA(intern_alphabet([]), 1, [], [0], [])
+        return regex_to_NFA(data['regex'])
+    if is_DFA_data(data):
+        return dfa_from_json(data)
+    return nfa_from_json(data)
@@ -0,0 +1,158 @@
+import json
+
+
+def state_key(state):
+    # State names are strings, except in the outputs of NFA2DFA and
+    # DFAMinimizer where every state is a list of the names it was made of
+    return tuple(map(state_key, state)) if isinstance(state, list) else state
+
+
+def compact_names(names):
+    # Automata whose states are exactly q0, q1, ... in order do not need to
+    # keep their names around
+    for i, name in enumerate(names):
+        if name != f"q{i}":
+            return list(names)
+    return None
+
+
+def read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(path, data, compact=False):
+    with open(path, 'w+') as f:
+        if compact:
+            json.dump(data, f, separators=(',', ':'))
+        else:
+            json.dump(data, f, indent=4)
+
+
+class StreamReader:
+
+    def __init__(self, f, chunk_size=1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        # Reads at least as much as is still buffered, so that a value that
+        # keeps failing to decode is retried a logarithmic number of times
+        data = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        # Skips whitespace and returns the next character without consuming it
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\n\r':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def next_char(self):
+        c = self.peek()
+        self.pos += 1
+        return c
+
+    def expect(self, expected):
+        if self.next_char() != expected:
+            raise ValueError("Malformed JSON input")
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number running up to the end of the buffer, or stopping at a
+            # character that could go on with it, such as the '.' of 15.0
+            # cut after the dot, may go on in the next chunk
+            if (end == len(self.buf) or self.buf[end] in '.eE+-') and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def read_json_stream(path, stream_keys=(), chunk_size=1 << 16):
+    # Yields (key, value) for the members of the top level object of a JSON
+    # file, in file order. The lists under stream_keys are not built: every
+    # item is yielded on its own as (key, item), so only one item at a time
+    # is held in memory.
+    with open(path) as f:
+        reader = StreamReader(f, chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            if key in stream_keys:
+                reader.expect('[')
+                if reader.peek() == ']':
+                    reader.pos += 1
+                else:
+                    while True:
+                        yield key, reader.value()
+                        c = reader.next_char()
+                        if c == ']':
+                            break
+                        if c != ',':
+                            raise ValueError("Malformed JSON input")
+            else:
+                yield key, reader.value()
+            c = reader.next_char()
+            if c == '}':
+                return
+            if c != ',':
+                raise ValueError("Malformed JSON input")
+
+
+def json_events(data, stream_keys=()):
+    # The same events as read_json_stream, from an already loaded object
+    for key, value in data.items():
+        if key in stream_keys:
+            for item in value:
+                yield key, item
+        else:
+            yield key, value
+
+
+def write_json_lists(path, fields, compact=False):
+    # Writes an object whose members are all lists, given as (key, iterable)
+    # pairs. Items are written as the iterables produce them, and the file
+    # is byte for byte what write_json would write for the same object.
+    with open(path, 'w+') as f:
+        if compact:
+            f.write('{')
+            for i, (key, items) in enumerate(fields):
+                f.write((',' if i else '') + json.dumps(key) + ':[')
+                for j, item in enumerate(items):
+                    f.write((',' if j else '') + json.dumps(item, separators=(',', ':')))
+                f.write(']')
+            f.write('}')
+            return
+
+        f.write('{')
+        for i, (key, items) in enumerate(fields):
+            f.write((',\n    ' if i else '\n    ') + json.dumps(key) + ': [')
+            empty = True
+            for item in items:
+                f.write(('\n' if empty else ',\n') + '        ' +
+                        json.dumps(item, indent=4).replace('\n', '\n        '))
+                empty = False
+            f.write(']' if empty else '\n    ]')
+        f.write('\n}' if fields else '}')
@@ -0,0 +1,75 @@
+from collections import OrderedDict
+
+from .nfa_simulation import NFASimulator
+
+
+class LazyDFA:
+    def __init__(self, nfa, cache_size=1024):
+        # DFA states are the bitsets of NFA states of the simulator, and are
+        # only determinised when an input first reaches them. Each cached
+        # state keeps the states it moves to as masks rather than references,
+        # so evicting one never invalidates another.
+        self.simulator = NFASimulator(nfa)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.fallbacks = 0
+
+    def row(self, state):
+        row = self.cache.get(state)
+        if row is None:
+            row = {}
+            self.cache[state] = row
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.cache.move_to_end(state)
+        return row
+
+    def move(self, state, c):
+        row = self.row(state)
+        next_state = row.get(c)
+        if next_state is None:
+            self.misses += 1
+            next_state = self.simulator.move(state, c)
+            row[c] = next_state
+        else:
+            self.hits += 1
+        return next_state
+
+    def match(self, string):
+        # If a single input evicts as many states as the cache holds, the
+        # cache is thrashing and only adds overhead, so the rest of that
+        # input is run directly on the NFA
+        evictions = self.evictions
+        state = self.simulator.start
+        for i, c in enumerate(string):
+            if self.evictions - evictions >= self.cache_size:
+                self.fallbacks += 1
+                for c in string[i:]:
+                    state = self.simulator.move(state, c)
+                    if not state:
+                        return False
+                break
+            state = self.move(state, c)
+            if not state:
+                return False
+        return self.simulator.accepts(state)
+
+    def match_all(self, strings):
+        if isinstance(strings, str):
+            return self.match(strings)
+        return [self.match(string) for string in strings]
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'fallbacks': self.fallbacks,
+            'cached_states': len(self.cache)
+        }
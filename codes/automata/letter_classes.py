@@ -0,0 +1,61 @@
+from array import array
+
+from .alphabet import intern_alphabet
+from .dfa import DFA
+
+# Letters that label exactly the same transitions everywhere in an automaton
+# behave identically, so the algorithms only need one column per class of
+# such letters. classes[c] lists the letter ids in class c, and classes are
+# numbered in the order of their first letter, which is their
+# representative. The compressed automaton keeps only the representatives
+# as its alphabet, and classes is the map back to the original letters.
+
+
+def letter_classes(signatures):
+    classes = []
+    by_signature = {}
+    for letter, signature in enumerate(signatures):
+        members = by_signature.get(signature)
+        if members is None:
+            members = by_signature[signature] = []
+            classes.append(members)
+        members.append(letter)
+    return classes
+
+
+def compress_DFA(dfa):
+    # The signature of a letter is its column of the transition table
+    k = len(dfa.alphabet)
+    classes = letter_classes(dfa.table[c::k].tobytes() for c in range(k))
+    if len(classes) == k:
+        return dfa, classes
+
+    width = len(classes)
+    table = array('i', [0]) * (dfa.n_states * width)
+    for c, members in enumerate(classes):
+        table[c::width] = array('i', dfa.table[members[0]::k])
+
+    alphabet = intern_alphabet([dfa.alphabet.letters[members[0]] for members in classes])
+    return DFA(alphabet, dfa.n_states, table, dfa.start, dfa.accepts, dfa.names), classes
+
+
+def expand_table(table, n_states, classes, k):
+    # A transition table over the k original letters, every letter taking
+    # the column of its class
+    if len(classes) == k:
+        return table
+
+    width = len(classes)
+    expanded = array('i', [0]) * (n_states * k)
+    for c, members in enumerate(classes):
+        column = array('i', table[c::width])
+        for letter in members:
+            expanded[letter::k] = column
+    return expanded
+
+
+def expand_DFA(dfa, alphabet, classes):
+    if len(classes) == len(alphabet):
+        return dfa
+    return DFA(alphabet, dfa.n_states, expand_table(dfa.table, dfa.n_states, classes, len(alphabet)),
+               dfa.start, dfa.accepts, dfa.names)
@@ -0,0 +1,104 @@
+from array import array
+
+from .letter_classes import compress_DFA
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class CompiledDFA:
+    def __init__(self, dfa):
+        # Row s of the table holds the next state for every letter, plus one
+        # extra column for characters outside the alphabet, which always
+        # lead to the dead state. The dead state is an extra row after the
+        # states of the DFA and also takes the place of missing transitions.
+        # Letters with the same column share one, so the table has a column
+        # per class of letters.
+        self.letters = list(dfa.alphabet.letters)
+        compressed, classes = compress_DFA(dfa)
+        self.letter_index = {self.letters[letter]: c
+                             for c, members in enumerate(classes) for letter in members}
+
+        n = dfa.n_states
+        k = len(classes)
+        self.dead = n
+        self.width = k + 1
+        self.table = array('i', [self.dead]) * ((n + 1) * self.width)
+
+        for s in range(n):
+            for c in range(k):
+                t = compressed.table[s * k + c]
+                if t != -1:
+                    self.table[s * self.width + c] = t
+
+        self.start = dfa.start
+        self.accept = bytearray(dfa.accepts)
+        self.accept.append(0)
+
+    def encode(self, string):
+        unknown = self.width - 1
+        return [self.letter_index.get(c, unknown) for c in string]
+
+    def run(self, string):
+        # The state the whole string leads to, self.dead if it fell off the DFA
+        table = self.table
+        width = self.width
+        s = self.start
+        for k in self.encode(string):
+            s = table[s * width + k]
+        return s
+
+    def move(self, s, letter):
+        return self.table[s * self.width + self.letter_index.get(letter, self.width - 1)]
+
+    def accepts(self, s):
+        return bool(self.accept[s])
+
+    def match(self, string):
+        return bool(self.accept[self.run(string)])
+
+    def match_all(self, strings):
+        if isinstance(strings, str):
+            return self.match(strings)
+        return [self.match(string) for string in strings]
+
+    def match_batch(self, strings):
+        # Inputs of the same length are stepped through the table together,
+        # one position at a time
+        strings = list(strings)
+        by_length = {}
+        for i, string in enumerate(strings):
+            by_length.setdefault(len(string), []).append(i)
+
+        results = [False] * len(strings)
+        for length, indices in by_length.items():
+            if numpy is not None:
+                accepted = self._lockstep_numpy([strings[i] for i in indices], length)
+            else:
+                accepted = self._lockstep([strings[i] for i in indices], length)
+            for i, ok in zip(indices, accepted):
+                results[i] = ok
+
+        return results
+
+    def _lockstep(self, group, length):
+        table = self.table
+        width = self.width
+        codes = [self.encode(string) for string in group]
+        current = [self.start] * len(group)
+        for pos in range(length):
+            current = [table[s * width + code[pos]]
+                       for s, code in zip(current, codes)]
+        return [bool(self.accept[s]) for s in current]
+
+    def _lockstep_numpy(self, group, length):
+        table = numpy.frombuffer(self.table, dtype=numpy.int32)
+        accept = numpy.frombuffer(bytes(self.accept), dtype=numpy.uint8)
+        codes = numpy.array([self.encode(string) for string in group],
+                            dtype=numpy.int32).reshape(len(group), length)
+        current = numpy.full(len(group), self.start, dtype=numpy.int32)
+        for pos in range(length):
+            current = table[current * self.width + codes[:, pos]]
+        return accept[current].astype(bool).tolist()
@@ -0,0 +1,194 @@
+from array import array
+
+from .dfa import DFA
+from .letter_classes import compress_DFA, expand_DFA
+
+
+class DisjointSet:
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.rank = [0] * n
+
+    def add(self):
+        self.parent.append(len(self.parent))
+        self.rank.append(0)
+        return len(self.parent) - 1
+
+    def find(self, x):
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, x, y):
+        x = self.find(x)
+        y = self.find(y)
+        if x == y:
+            return
+        if self.rank[x] < self.rank[y]:
+            x, y = y, x
+        self.parent[y] = x
+        if self.rank[x] == self.rank[y]:
+            self.rank[x] += 1
+
+
+def table_filling_classes(dfa):
+
+    n = dfa.n_states
+    k = len(dfa.alphabet)
+    table = dfa.table
+    filling_table = [['' for _ in range(n)] for _ in range(n)]
+
+    for i in range(n):
+        for j in range(i):
+            filling_table[i][j] = dfa.accepts[i] != dfa.accepts[j]
+
+    while True:
+        changed = False
+        for i in range(n):
+            for j in range(i):
+                if not filling_table[i][j]:
+                    for c in range(k):
+                        x = table[i * k + c]
+                        y = table[j * k + c]
+                        if filling_table[x][y] or filling_table[y][x]:
+                            filling_table[i][j] = True
+                            changed = True
+        if not changed:
+            break
+
+    merged_states = DisjointSet(n)
+
+    for i in range(n):
+        for j in range(i):
+            if not filling_table[i][j]:
+                merged_states.union(i, j)
+
+    classes = {}
+    for i in range(n):
+        classes.setdefault(merged_states.find(i), []).append(i)
+
+    return sorted(classes.values())
+
+
+def hopcroft_classes(dfa, labels=None):
+
+    # Two states can only end up in the same class if they have the same
+    # label. The labels default to the accept flags.
+    n = dfa.n_states
+    letter_count = len(dfa.alphabet)
+    if labels is None:
+        labels = dfa.accepts
+
+    # inverse[k][t] lists every state that moves to t on letter k
+    inverse = [[[] for _ in range(n)] for _ in range(letter_count)]
+    for s in range(n):
+        for k in range(letter_count):
+            inverse[k][dfa.table[s * letter_count + k]].append(s)
+
+    groups = {}
+    for s in range(n):
+        groups.setdefault(labels[s], []).append(s)
+
+    blocks = [set(block) for block in groups.values()]
+    block_of = [0] * n
+    for b, block in enumerate(blocks):
+        for s in block:
+            block_of[s] = b
+
+    # Only the smaller half of every split has to be used as a splitter,
+    # and of the initial blocks, all but the largest one
+    largest = max(range(len(blocks)), key=lambda b: len(blocks[b]), default=0)
+    waiting = [(b, k) for b in range(len(blocks)) if b != largest
+               for k in range(letter_count)]
+    in_waiting = set(waiting)
+
+    while waiting:
+        splitter = waiting.pop()
+        in_waiting.discard(splitter)
+        b, k = splitter
+
+        touched = {}
+        for t in blocks[b]:
+            for s in inverse[k][t]:
+                touched.setdefault(block_of[s], []).append(s)
+
+        for y, hits in touched.items():
+            if len(hits) == len(blocks[y]):
+                continue
+
+            new_block = set(hits)
+            blocks[y] -= new_block
+            z = len(blocks)
+            blocks.append(new_block)
+            for s in new_block:
+                block_of[s] = z
+
+            for c in range(letter_count):
+                if (y, c) in in_waiting or len(new_block) <= len(blocks[y]):
+                    waiting.append((z, c))
+                    in_waiting.add((z, c))
+                else:
+                    waiting.append((y, c))
+                    in_waiting.add((y, c))
+
+    return sorted(sorted(block) for block in blocks)
+
+
+def merge_classes(dfa, classes, dead=None):
+
+    # alias[s] is the class of state s. A merged state is named by the
+    # list of the names of its members. The added dead state of
+    # complete_DFA is left out: on its own it is dropped again, and
+    # transitions to it become missing transitions.
+    if dead is not None:
+        classes = [merged_state for merged_state in classes if merged_state != [dead]]
+    alias = array('i', [-1] * dfa.n_states)
+    for c, merged_state in enumerate(classes):
+        for s in merged_state:
+            alias[s] = c
+
+    k = len(dfa.alphabet)
+    table = array('i')
+    accepts = bytearray(len(classes))
+    for c, merged_state in enumerate(classes):
+        representative = merged_state[0]
+        table.extend(alias[t] for t in dfa.table[representative * k:(representative + 1) * k])
+        accepts[c] = dfa.accepts[representative]
+
+    names = [[dfa.state_name(s) for s in merged_state if s != dead] for merged_state in classes]
+
+    return DFA(dfa.alphabet, len(classes), table, alias[dfa.start], accepts, names)
+
+
+def complete_DFA(dfa):
+
+    # The DFA with every missing transition going to an added dead state,
+    # the last state, which both minimizers need to tell states apart
+    n = dfa.n_states
+    k = len(dfa.alphabet)
+    table = array('i', (n if t == -1 else t for t in dfa.table))
+    table.extend(array('i', [n]) * k)
+    names = None if dfa.names is None else list(dfa.names) + [None]
+    return DFA(dfa.alphabet, n + 1, table, dfa.start, dfa.accepts + bytearray(1), names)
+
+
+def minimize(dfa, table_filling=False):
+
+    # Letters with the same column always split the same states, so only
+    # one letter per class is looked at
+    compressed, letter_classes = compress_DFA(dfa)
+    dead = None
+    if not compressed.is_complete():
+        compressed = complete_DFA(compressed)
+        dead = compressed.n_states - 1
+
+    if table_filling:
+        classes = table_filling_classes(compressed)
+    else:
+        classes = hopcroft_classes(compressed)
+    minimal = merge_classes(compressed, classes, dead)
+    return expand_DFA(minimal, dfa.alphabet, letter_classes)
@@ -0,0 +1,216 @@
+from array import array
+
+from .alphabet import EPSILON, intern_alphabet
+from .jsonio import compact_names, json_events, read_json, read_json_stream, state_key
+from .reachability import (bfs, build_adjacency, prune_automaton,
+                           strongly_connected_components)
+
+
+class EdgeList:
+    __slots__ = ('sources', 'labels', 'targets')
+
+    def __init__(self):
+        # (s, label, t) triples kept in three int arrays instead of a list
+        # of tuples, for building large NFAs
+        self.sources = array('i')
+        self.labels = array('i')
+        self.targets = array('i')
+
+    def append(self, s, label, t):
+        self.sources.append(s)
+        self.labels.append(label)
+        self.targets.append(t)
+
+    def __len__(self):
+        return len(self.sources)
+
+    def __iter__(self):
+        return zip(self.sources, self.labels, self.targets)
+
+
+class NFA:
+    __slots__ = ('alphabet', 'n_states', 'names', 'offsets', 'labels', 'targets',
+                 'starts', 'accepts')
+
+    def __init__(self, alphabet, n_states, edges, starts, accepts, names=None):
+        # Transitions are stored CSR style: the edges leaving state s are
+        # labels[i] -> targets[i] for i in range(offsets[s], offsets[s + 1]),
+        # in the order they were given. A label is a letter id of the
+        # alphabet, or EPSILON. names is None when the states are q0, q1, ...
+        self.alphabet = alphabet
+        self.n_states = n_states
+        self.names = names
+
+        self.offsets = array('i', [0] * (n_states + 1))
+        for s, _, _ in edges:
+            self.offsets[s + 1] += 1
+        for s in range(n_states):
+            self.offsets[s + 1] += self.offsets[s]
+
+        fill = array('i', self.offsets)
+        self.labels = array('i', [0] * len(edges))
+        self.targets = array('i', [0] * len(edges))
+        for s, label, t in edges:
+            self.labels[fill[s]] = label
+            self.targets[fill[s]] = t
+            fill[s] += 1
+
+        self.starts = array('i', starts)
+        self.accepts = array('i', accepts)
+
+    def state_name(self, s):
+        return f"q{s}" if self.names is None else self.names[s]
+
+    def label_name(self, label):
+        return '$' if label == EPSILON else self.alphabet.letters[label]
+
+    def edges(self, s):
+        for i in range(self.offsets[s], self.offsets[s + 1]):
+            yield self.labels[i], self.targets[i]
+
+    def json_fields(self):
+        # The members of to_json() as (key, iterable) pairs, with the
+        # transitions generated as they are written
+        names = [self.state_name(s) for s in range(self.n_states)]
+
+        def transitions():
+            for s in range(self.n_states):
+                for label, t in self.edges(s):
+                    yield [names[s], self.label_name(label), names[t]]
+
+        return [('states', names),
+                ('letters', self.alphabet.letters),
+                ('transition_function', transitions()),
+                ('start_states', (names[s] for s in self.starts)),
+                ('final_states', (names[s] for s in self.accepts))]
+
+    def to_json(self):
+        return {key: list(items) for key, items in self.json_fields()}
+
+    def print_data(self):
+        print("=STATES=")
+        for s in range(self.n_states):
+            print(self.state_name(s))
+        print("=ALPHABET=")
+        for c in self.alphabet:
+            print(c)
+        print("=INITIAL STATES=")
+        for s in self.starts:
+            print(self.state_name(s))
+        print("=ACCEPT STATES=")
+        for s in self.accepts:
+            print(self.state_name(s))
+        print("=TRANSITIONS=")
+        for s in range(self.n_states):
+            for label, t in self.edges(s):
+                print(f"{self.state_name(s)}:{self.label_name(label)}>{self.state_name(t)}")
+
+
+def nfa_from_events(events):
+    # Builds an NFA from the (key, value) pairs of read_json_stream, with
+    # the transitions one at a time. Transitions that come before the states
+    # and letters in the file are held back until those are known.
+    data = {}
+    edges = EdgeList()
+    pending = []
+
+    def add(transition):
+        s, a, ns = transition
+        label = EPSILON if a == '$' else alphabet.index[a]
+        edges.append(state_index[state_key(s)], label, state_index[state_key(ns)])
+
+    for key, value in events:
+        if key != 'transition_function':
+            data[key] = value
+            if key == 'states':
+                state_index = {state_key(state): i for i, state in enumerate(value)}
+            elif key == 'letters':
+                alphabet = intern_alphabet([letter for letter in value if letter != '$'])
+        elif 'states' in data and 'letters' in data:
+            add(value)
+        else:
+            pending.append(value)
+
+    for transition in pending:
+        add(transition)
+
+    return NFA(alphabet, len(state_index), edges,
+               [state_index[state_key(s)] for s in data['start_states']],
+               [state_index[state_key(s)] for s in data['final_states']],
+               compact_names(data['states']))
+
+
+def nfa_from_json(nfa_data):
+    return nfa_from_events(json_events(nfa_data, ('transition_function',)))
+
+
+def prune_NFA(nfa):
+    # prune_automaton(prune_dead=True, keep_sink=False) on a compact NFA:
+    # only the states that are reachable and can reach an accept state are
+    # kept, in their order
+    n = nfa.n_states
+    reachable, _ = bfs(nfa.offsets, nfa.targets, nfa.starts)
+    offsets, targets = build_adjacency(
+        n, [(s, t) for s in range(n) for _, t in nfa.edges(s)], reverse=True)
+    live, _ = bfs(offsets, targets, nfa.accepts)
+
+    new_id = array('i', [-1]) * n
+    kept = [s for s in range(n) if reachable[s] and live[s]]
+    for i, s in enumerate(kept):
+        new_id[s] = i
+
+    edges = EdgeList()
+    for s in kept:
+        for label, t in nfa.edges(s):
+            if new_id[t] != -1:
+                edges.append(new_id[s], label, new_id[t])
+
+    return NFA(nfa.alphabet, len(kept), edges,
+               [new_id[s] for s in nfa.starts if new_id[s] != -1],
+               [new_id[s] for s in nfa.accepts if new_id[s] != -1],
+               compact_names([nfa.state_name(s) for s in kept]))
+
+
+def load_NFA_from_file(path, prune=False, stream=False):
+    # With stream the file is never loaded whole, see read_json_stream
+    if stream:
+        nfa = nfa_from_events(read_json_stream(path, ('transition_function',)))
+        return prune_NFA(nfa) if prune else nfa
+
+    nfa_data = read_json(path)
+
+    if prune:
+        nfa_data = prune_automaton(nfa_data, prune_dead=True, keep_sink=False)
+
+    return nfa_from_json(nfa_data)
+
+
+def compute_ec(nfa):
+
+    successors = []
+    for s in range(nfa.n_states):
+        successors.append([t for label, t in nfa.edges(s) if label == EPSILON])
+
+    component, components = strongly_connected_components(successors)
+
+    # Every state of a component has the same closure, kept as a bitmask
+    # (bit i is state i): the component itself OR the closures of the
+    # components it has epsilon edges into, which were already computed
+    # since those come earlier in the list. A state with a single epsilon
+    # edge out of its component shares the int of its successor.
+    closures = []
+    for c, members in enumerate(components):
+        if len(members) == 1 and len(successors[members[0]]) < 2:
+            next_components = {component[w] for w in successors[members[0]]}
+        else:
+            next_components = {component[w]
+                               for v in members for w in successors[v]}
+        next_components.discard(c)
+        closure = 0
+        for v in members:
+            closure |= 1 << v
+        for d in next_components:
+            closure |= closures[d]
+        closures.append(closure)
+
+    return [closures[component[s]] for s in range(nfa.n_states)]
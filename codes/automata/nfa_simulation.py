@@ -0,0 +1,67 @@
+import time
+
+from .alphabet import EPSILON
+from .nfa import compute_ec
+
+
+class NFASimulator:
+    def __init__(self, nfa):
+        # The set of active NFA states is a single int, bit i standing for
+        # NFA state i. Epsilon closures are precomputed as masks, and so
+        # is the $* a $* step of every state, so one input character costs
+        # an AND with the states that have an edge on it and one OR per
+        # state that survives.
+        start = time.perf_counter()
+
+        ec_masks = compute_ec(nfa)
+
+        self.has_edge = {letter: 0 for letter in nfa.alphabet}
+        self.step = {letter: {} for letter in nfa.alphabet}
+
+        for s in range(nfa.n_states):
+            for label, t in nfa.edges(s):
+                if label == EPSILON:
+                    continue
+                letter = nfa.alphabet.letters[label]
+                self.has_edge[letter] |= 1 << s
+                step = self.step[letter]
+                step[s] = step.get(s, 0) | ec_masks[t]
+
+        self.start = 0
+        for s in nfa.starts:
+            self.start |= ec_masks[s]
+
+        self.accept_mask = 0
+        for s in nfa.accepts:
+            self.accept_mask |= 1 << s
+
+        self.setup_time = time.perf_counter() - start
+
+    def move(self, active, c):
+        edges = self.has_edge.get(c)
+        if edges is None:
+            return 0
+        active &= edges
+        step = self.step[c]
+        next_active = 0
+        while active:
+            low = active & -active
+            next_active |= step[low.bit_length() - 1]
+            active ^= low
+        return next_active
+
+    def accepts(self, active):
+        return bool(active & self.accept_mask)
+
+    def match(self, string):
+        active = self.start
+        for c in string:
+            active = self.move(active, c)
+            if not active:
+                return False
+        return self.accepts(active)
+
+    def match_all(self, strings):
+        if isinstance(strings, str):
+            return self.match(strings)
+        return [self.match(string) for string in strings]
@@ -0,0 +1,86 @@
+import time
+
+from .binary import is_binary, open_DFA, open_NFA, write_binary
+from .determinize import determinize
+from .dfa import dfa_from_json
+from .dfa2regex import gen_regex
+from .jsonio import read_json, write_json, write_json_lists
+from .minimize import minimize
+from .nfa import nfa_from_json
+from .reachability import prune_automaton, prune_DFA
+from .regex import regex_to_NFA
+
+# The chain regex -> NFA -> DFA -> minimal DFA -> regex. STAGES[i] takes
+# the output of INPUTS[i], which is also what STAGES[i - 1] produces.
+INPUTS = ['regex', 'nfa', 'dfa', 'min-dfa']
+STAGES = ['nfa', 'dfa', 'min-dfa', 'regex']
+
+
+def load_input(kind, data):
+    # The same cleanup the numbered programs do on the files they read
+    if kind == 'regex':
+        return data['regex']
+    elif kind == 'nfa':
+        return nfa_from_json(data)
+    elif kind == 'dfa':
+        return dfa_from_json(prune_automaton(data), sort_states=True, sort_letters=True)
+    else:
+        return dfa_from_json(prune_automaton(data, prune_dead=True))
+
+
+def read_input(kind, path):
+    # load_input on a file in either format
+    if kind == 'regex' or not is_binary(path):
+        return load_input(kind, read_json(path))
+    elif kind == 'nfa':
+        return open_NFA(path)
+    elif kind == 'dfa':
+        return prune_DFA(open_DFA(path, sort_states=True, sort_letters=True))
+    else:
+        return prune_DFA(open_DFA(path), prune_dead=True)
+
+
+def write_output(path, stage, value, compact=False, binary=False):
+    # Automata are written as their transitions are generated
+    if stage == 'regex':
+        write_json(path, {'regex': value}, compact)
+    elif binary:
+        write_binary(path, value)
+    else:
+        write_json_lists(path, value.json_fields(), compact)
+
+
+def run_stage(stage, value, table_filling=False, order='reverse', max_size=None):
+    if stage == 'nfa':
+        return regex_to_NFA(value)
+    elif stage == 'dfa':
+        return determinize(value)
+    elif stage == 'min-dfa':
+        return minimize(prune_DFA(value), table_filling)
+    else:
+        return gen_regex(prune_DFA(value, prune_dead=True), max_size, order)
+
+
+def stage_range(start, end):
+    # The stages that turn a start input into an end output, in order
+    first = INPUTS.index(start)
+    last = STAGES.index(end)
+    if last < first:
+        raise ValueError(f"cannot go from {start} to {end}")
+    return STAGES[first:last + 1]
+
+
+def run_pipeline(value, start, end, on_stage=None, **options):
+    # Runs the stages from start to end on value, passing the automata
+    # between them directly. on_stage(stage, output) is called after every
+    # stage, outside of its timing. Returns the output of the last stage
+    # and the time taken by every stage.
+    timings = []
+    for stage in stage_range(start, end):
+        started = time.perf_counter()
+        value = run_stage(stage, value, **options)
+        timings.append((stage, time.perf_counter() - started))
+        if on_stage is not None:
+            on_stage(stage, value)
+
+    return value, timings
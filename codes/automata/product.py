@@ -0,0 +1,158 @@
+from array import array
+
+from .alphabet import intern_alphabet
+from .dfa import DFA
+from .minimize import hopcroft_classes, merge_classes
+from .reachability import bfs, build_adjacency
+
+# How the acceptance of the product follows from the acceptance of its two
+# components
+OPERATIONS = {
+    'intersection': lambda x, y: x and y,
+    'union': lambda x, y: x or y,
+    'difference': lambda x, y: x and not y,
+}
+
+
+def live_states(dfa):
+    # The states from which a final state can be reached
+    n = dfa.n_states
+    k = len(dfa.alphabet)
+    edges = [(s, t) for s in range(n) for t in dfa.table[s * k:(s + 1) * k] if t != -1]
+    offsets, targets = build_adjacency(n, edges, reverse=True)
+    live, _ = bfs(offsets, targets, [s for s in range(n) if dfa.accepts[s]])
+    return live
+
+
+def component_steps(dfa, letters):
+    # Transition table of a component over the joint letters, on codes
+    # instead of states: code s + 1 is state s, and code 0 stands for all
+    # the states that can no longer accept, including missing transitions
+    # and letters the component does not have. Row 0 is all zeros.
+    n = dfa.n_states
+    k = len(letters)
+    width = len(dfa.alphabet)
+    live = live_states(dfa)
+    columns = [(c, dfa.alphabet.index[letter])
+               for c, letter in enumerate(letters) if letter in dfa.alphabet.index]
+
+    step = array('i', [0]) * ((n + 1) * k)
+    for s in range(n):
+        for c, j in columns:
+            t = dfa.table[s * width + j]
+            if t != -1 and live[t]:
+                step[(s + 1) * k + c] = t + 1
+
+    start = dfa.start + 1 if live[dfa.start] else 0
+    return start, step
+
+
+def explore(dfas, letters, label, dead):
+    # Builds the reachable part of the product of dfas over letters. A
+    # product state is a tuple of component codes (see component_steps),
+    # kept as one mixed radix integer. label(codes) is the accept label of
+    # a product state, and every state with dead(codes) true is merged into
+    # a single sink as soon as it is reached, so that it is never expanded.
+    # Returns the complete product DFA, with the start as state 0, and the
+    # label of every state.
+    k = len(letters)
+    radix = [dfa.n_states + 1 for dfa in dfas]
+    starts, steps = zip(*(component_steps(dfa, letters) for dfa in dfas))
+
+    def encode(codes):
+        key = 0
+        for code, r in zip(reversed(codes), reversed(radix)):
+            key = key * r + code
+        return key
+
+    def decode(key):
+        codes = []
+        for r in radix:
+            key, code = divmod(key, r)
+            codes.append(code)
+        return tuple(codes)
+
+    ids = {}
+    keys = []
+
+    # Key 0 is the product state where every component is dead
+    def intern(codes):
+        key = 0 if dead(codes) else encode(codes)
+        state = ids.get(key)
+        if state is None:
+            state = ids[key] = len(keys)
+            keys.append(key)
+        return state
+
+    intern(starts)
+    table = array('i')
+    state = 0
+    while state < len(keys):
+        codes = decode(keys[state])
+        for c in range(k):
+            table.append(intern(tuple(step[code * k + c] for step, code in zip(steps, codes))))
+        state += 1
+
+    labels = [label(decode(key)) for key in keys]
+    accepts = bytearray(1 if l else 0 for l in labels)
+    return DFA(intern_alphabet(letters), len(keys), table, 0, accepts), labels
+
+
+def joint_letters(dfas):
+    return sorted(set().union(*(dfa.alphabet.letters for dfa in dfas)))
+
+
+def unnamed(dfa):
+    # The states of a product have no names worth keeping
+    return DFA(dfa.alphabet, dfa.n_states, dfa.table, dfa.start, dfa.accepts)
+
+
+def minimal(dfa):
+    return unnamed(merge_classes(dfa, hopcroft_classes(dfa)))
+
+
+def combine(a, b, operation):
+    # Minimal DFA for the intersection, union or difference of the
+    # languages of a and b, over the letters of both
+    accept = OPERATIONS[operation]
+    dfas = (a, b)
+
+    def accepting(codes):
+        return [code != 0 and bool(dfa.accepts[code - 1]) for dfa, code in zip(dfas, codes)]
+
+    # A product state is dead if it cannot accept whatever its live
+    # components go on to do, since dead components never accept again
+    choices = ((False,), (False, True))
+    dead_for = [[not any(accept(x, y) for x in choices[live_a] for y in choices[live_b])
+                 for live_b in (0, 1)] for live_a in (0, 1)]
+
+    def dead(codes):
+        return dead_for[codes[0] != 0][codes[1] != 0]
+
+    dfa, _ = explore(dfas, joint_letters(dfas), lambda codes: accept(*accepting(codes)), dead)
+    return minimal(dfa)
+
+
+def complement(dfa, letters=None):
+    # Minimal DFA accepting exactly the strings over letters (by default
+    # the letters of dfa) that dfa rejects
+    letters = sorted(dfa.alphabet.letters) if letters is None else letters
+    product, _ = explore([dfa], letters,
+                         lambda codes: not (codes[0] and dfa.accepts[codes[0] - 1]),
+                         lambda codes: False)
+    return minimal(product)
+
+
+def combine_patterns(dfas):
+    # One DFA for many patterns: it accepts a string if any of dfas does,
+    # and matches[s] lists the indices of the dfas that accept the strings
+    # ending in state s. States are only merged if they match the same
+    # patterns.
+    def label(codes):
+        return tuple(i for i, (dfa, code) in enumerate(zip(dfas, codes))
+                     if code and dfa.accepts[code - 1])
+
+    dfa, labels = explore(dfas, joint_letters(dfas), label, lambda codes: not any(codes))
+    classes = hopcroft_classes(dfa, labels)
+    matches = [labels[members[0]] for members in classes]
+    return unnamed(merge_classes(dfa, classes)), matches
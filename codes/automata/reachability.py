@@ -0,0 +1,209 @@
+from array import array
+
+from .dfa import DFA
+from .jsonio import compact_names, state_key
+
+
+def build_adjacency(n, edges, reverse=False):
+    # Compressed adjacency: the neighbours of state s are
+    # targets[offsets[s]:offsets[s + 1]]
+    offsets = array('i', [0] * (n + 1))
+    for s, t in edges:
+        offsets[(t if reverse else s) + 1] += 1
+    for s in range(n):
+        offsets[s + 1] += offsets[s]
+
+    fill = array('i', offsets)
+    targets = array('i', [0] * len(edges))
+    for s, t in edges:
+        if reverse:
+            s, t = t, s
+        targets[fill[s]] = t
+        fill[s] += 1
+
+    return offsets, targets
+
+
+def bfs(offsets, targets, sources):
+    n = len(offsets) - 1
+    visited = bytearray(n)
+    order = []
+    for s in sources:
+        if not visited[s]:
+            visited[s] = 1
+            order.append(s)
+
+    head = 0
+    while head < len(order):
+        s = order[head]
+        head += 1
+        for i in range(offsets[s], offsets[s + 1]):
+            t = targets[i]
+            if not visited[t]:
+                visited[t] = 1
+                order.append(t)
+
+    return visited, order
+
+
+def prune_automaton(data, prune_dead=False, keep_sink=True):
+    # Removes the states that cannot be reached from a start state and,
+    # with prune_dead, the states from which no final state can be reached.
+    # Transitions into removed dead states are redirected to a single dead
+    # sink so that a complete DFA stays complete.
+    states = data['states']
+    state_index = {state_key(state): i for i, state in enumerate(states)}
+    n = len(states)
+
+    edges = [(state_index[state_key(s)], state_index[state_key(ns)])
+             for s, _, ns in data['transition_function']]
+    starts = [state_index[state_key(s)] for s in data['start_states']]
+    finals = [state_index[state_key(s)] for s in data['final_states']]
+
+    offsets, targets = build_adjacency(n, edges)
+    keep, order = bfs(offsets, targets, starts)
+
+    sink = -1
+    if prune_dead:
+        offsets, targets = build_adjacency(n, edges, reverse=True)
+        live, _ = bfs(offsets, targets, finals)
+        for s in order:
+            if not live[s]:
+                keep[s] = 0
+                if sink == -1 and keep_sink:
+                    sink = s
+        if sink != -1:
+            keep[sink] = 1
+
+    alias = list(range(n))
+    if sink != -1:
+        for s in order:
+            if not live[s]:
+                alias[s] = sink
+
+    transition_function = []
+    sink_letters = []
+    for transition in data['transition_function']:
+        s = state_index[state_key(transition[0])]
+        ns = alias[state_index[state_key(transition[2])]]
+        if not keep[s] or not keep[ns]:
+            continue
+        if s == sink:
+            if transition[1] not in sink_letters:
+                sink_letters.append(transition[1])
+            continue
+        transition_function.append([transition[0], transition[1], states[ns]])
+
+    for letter in sink_letters:
+        transition_function.append([states[sink], letter, states[sink]])
+
+    pruned = dict(data)
+    pruned['states'] = [states[s] for s in range(n) if keep[s]]
+    pruned['transition_function'] = transition_function
+    pruned['start_states'] = [s for s in data['start_states']
+                              if keep[state_index[state_key(s)]]]
+    pruned['final_states'] = [s for s in data['final_states']
+                              if keep[state_index[state_key(s)]]]
+
+    return pruned
+
+
+def strongly_connected_components(successors):
+
+    # Iterative Tarjan. Components are emitted in reverse topological
+    # order: every component reachable from a given one is emitted before
+    # it.
+    n = len(successors)
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    component = [-1] * n
+    components = []
+    stack = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, iter(successors[root]))]
+
+        while work:
+            v, edges = work[-1]
+            for w in edges:
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, iter(successors[w])))
+                    break
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+            else:
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    if low[v] < low[u]:
+                        low[u] = low[v]
+
+                if low[v] == index[v]:
+                    members = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component[w] = len(components)
+                        members.append(w)
+                        if w == v:
+                            break
+                    components.append(members)
+
+    return component, components
+
+
+def prune_DFA(dfa, prune_dead=False):
+    # prune_automaton on a compact DFA, without going through JSON. The
+    # kept states stay in their order, and dead states always go to a
+    # sink, so the start state is never removed.
+    n = dfa.n_states
+    k = len(dfa.alphabet)
+    table = dfa.table
+
+    edges = [(s, table[s * k + c]) for s in range(n) for c in range(k)
+             if table[s * k + c] != -1]
+    offsets, targets = build_adjacency(n, edges)
+    keep, order = bfs(offsets, targets, [dfa.start])
+
+    sink = -1
+    if prune_dead:
+        offsets, targets = build_adjacency(n, edges, reverse=True)
+        live, _ = bfs(offsets, targets, [s for s in range(n) if dfa.accepts[s]])
+        for s in order:
+            if not live[s]:
+                keep[s] = 0
+                if sink == -1:
+                    sink = s
+        if sink != -1:
+            keep[sink] = 1
+
+    new_id = array('i', [-1]) * n
+    kept = [s for s in range(n) if keep[s]]
+    for i, s in enumerate(kept):
+        new_id[s] = i
+    if sink != -1:
+        for s in order:
+            if not live[s]:
+                new_id[s] = new_id[sink]
+
+    new_table = array('i')
+    for s in kept:
+        new_table.extend(new_id[t] if t != -1 else -1 for t in table[s * k:(s + 1) * k])
+
+    names = compact_names([dfa.state_name(s) for s in kept])
+
+    return DFA(dfa.alphabet, len(kept), new_table, new_id[dfa.start],
+               bytearray(dfa.accepts[s] for s in kept), names)
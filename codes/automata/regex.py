@@ -0,0 +1,312 @@
+import re
+
+from .alphabet import EPSILON, intern_alphabet
+from .nfa import NFA
+
+precedence = {
+    '*': 3,
+    '.': 2,
+    '+': 1
+}
+
+
+class PopException(Exception):
+    pass
+
+
+class MalformedRegex(Exception):
+    pass
+
+
+class Stack:
+    def __init__(self):
+        # The top of the stack is the end of the list
+        self.__data__ = []
+
+    def push(self, val):
+        self.__data__.append(val)
+
+    def top(self):
+        if not self.__data__:
+            raise PopException
+        return self.__data__[-1]
+
+    def pop(self):
+        if self.__data__:
+            self.__data__.pop()
+        else:
+            raise PopException
+
+    def size(self):
+        return len(self.__data__)
+
+    def empty(self):
+        return not self.__data__
+
+
+def match_parentheses(regex):
+    tracker = 0
+    for c in regex:
+        if c == '(':
+            tracker += 1
+        elif c == ')':
+            tracker -= 1
+        if tracker < 0:
+            return False
+    return tracker == 0
+
+
+def tokenize(regex):
+    # Split the regex into single character tokens, inserting the implicit
+    # concatenation operator '.' wherever two factors meet
+    tokens = []
+    prev = '('
+    for c in regex:
+        if prev not in '(+' and c not in ')*+':
+            tokens.append('.')
+        tokens.append(c)
+        prev = c
+    return tokens
+
+
+def apply_operator(operands, op):
+    right = operands.top()
+    operands.pop()
+    left = operands.top()
+    operands.pop()
+    operands.push((op, left, right))
+
+
+def parse(tokens):
+    # Shunting-yard, building the syntax tree as operators are emitted.
+    # Nodes are ('sym', c), ('*', child) or ('.'/'+', left, right).
+    operands = Stack()
+    s = Stack()
+
+    for c in tokens:
+        if c == '*':
+            child = operands.top()
+            operands.pop()
+            operands.push(('*', child))
+        elif c not in '()+.':
+            operands.push(('sym', c))
+        elif c == '(':
+            s.push(c)
+        elif c == ')':
+            while(s.top() != '('):
+                apply_operator(operands, s.top())
+                s.pop()
+            s.pop()
+        else:
+            if s.empty():
+                s.push(c)
+            else:
+                if s.top() == '(':
+                    s.push(c)
+                elif precedence[c] > precedence[s.top()]:
+                    s.push(c)
+                elif precedence[c] == precedence[s.top()]:
+                    apply_operator(operands, c)
+                else:
+                    while not s.empty() and s.top() != '(' and precedence[c] < precedence[s.top()]:
+                        apply_operator(operands, s.top())
+                        s.pop()
+                    s.push(c)
+    while not s.empty():
+        if s.top() == '(':
+            raise PopException
+        apply_operator(operands, s.top())
+        s.pop()
+
+    if operands.size() != 1:
+        raise PopException
+
+    return operands.top()
+
+
+class NFABuilder:
+    def __init__(self):
+        # Every fragment built from the regex lives in this one arena. States
+        # are integer ids handed out by a counter in creation order, which
+        # is already the final numbering: state i is written out as q{i}.
+        # edges lists the (state, action, next state) triples in the order
+        # they were added, and a fragment is just its (init, accept) pair.
+        self.state_count = 0
+        self.alphabet = set()
+        self.edges = []
+        self.init_state = None
+        self.accept_state = None
+
+    def add_state(self):
+        s = self.state_count
+        self.state_count += 1
+        return s
+
+    def add_transition(self, s, a, ns):
+        self.edges.append((s, a, ns))
+
+    def to_NFA(self):
+        alphabet = intern_alphabet(sorted(self.alphabet))
+        edges = [(s, EPSILON if a == '$' else alphabet.index[a], ns)
+                 for s, a, ns in self.edges]
+        return NFA(alphabet, self.state_count, edges,
+                   [self.init_state], [self.accept_state])
+
+
+def atom(N, c):
+    init_state = N.add_state()
+    accept_state = N.add_state()
+    if c != '$':
+        N.alphabet.add(c)
+    N.add_transition(init_state, c, accept_state)
+
+    return init_state, accept_state
+
+
+def letter_union(N, letters):
+    # A union of single letters such as (a+b+c) is one pair of states with
+    # an edge per letter, instead of a Thompson union of atoms, so that the
+    # letters share their states and NFA2DFA finds them interchangeable
+    init_state = N.add_state()
+    accept_state = N.add_state()
+    for c in letters:
+        if c != '$':
+            N.alphabet.add(c)
+        N.add_transition(init_state, c, accept_state)
+
+    return init_state, accept_state
+
+
+def concat(N, F1, F2):
+    # Add transition based on Thompson construction
+    N.add_transition(F1[1], '$', F2[0])
+
+    return F1[0], F2[1]
+
+
+def union(N, F1, F2):
+    init_state = N.add_state()
+    accept_state = N.add_state()
+
+    # Add transitions based on Thompson Construction
+    N.add_transition(init_state, '$', F1[0])
+    N.add_transition(init_state, '$', F2[0])
+    N.add_transition(F1[1], '$', accept_state)
+    N.add_transition(F2[1], '$', accept_state)
+
+    return init_state, accept_state
+
+
+def kleen(N, F1):
+    init_state = N.add_state()
+    accept_state = N.add_state()
+
+    # Add transitions based on Thompson Construction
+    N.add_transition(init_state, '$', F1[0])
+    N.add_transition(F1[1], '$', accept_state)
+    N.add_transition(init_state, '$', accept_state)
+    N.add_transition(F1[1], '$', F1[0])
+
+    return init_state, accept_state
+
+
+def letter_unions(tree):
+    # The ids of the union nodes whose leaves are all single symbols, found
+    # bottom up in one pass
+    unions = set()
+    work = [(tree, False)]
+    while work:
+        node, expanded = work.pop()
+        if node[0] == 'sym':
+            continue
+        if not expanded:
+            work.append((node, True))
+            work.extend((child, False) for child in node[1:])
+        elif node[0] == '+' and all(child[0] == 'sym' or id(child) in unions for child in node[1:]):
+            unions.add(id(node))
+    return unions
+
+
+def union_letters(node):
+    # The symbols of a union of single symbols, left to right, once each
+    letters = {}
+    work = [node]
+    while work:
+        node = work.pop()
+        if node[0] == 'sym':
+            letters[node[1]] = None
+        else:
+            work.extend(reversed(node[1:]))
+    return list(letters)
+
+
+def build_NFA(N, tree):
+    # Post-order walk with an explicit stack, so deeply nested expressions
+    # do not hit the recursion limit. Children are built left to right
+    # before their operator, in the order a postfix expression would.
+    unions = letter_unions(tree)
+    fragments = Stack()
+    work = [(tree, False)]
+    while work:
+        node, expanded = work.pop()
+        if node[0] == 'sym':
+            fragments.push(atom(N, node[1]))
+        elif id(node) in unions:
+            fragments.push(letter_union(N, union_letters(node)))
+        elif not expanded:
+            work.append((node, True))
+            for child in reversed(node[1:]):
+                work.append((child, False))
+        # Kleen
+        elif node[0] == '*':
+            F1 = fragments.top()
+            fragments.pop()
+            fragments.push(kleen(N, F1))
+        else:
+            F2 = fragments.top()
+            fragments.pop()
+            F1 = fragments.top()
+            fragments.pop()
+            # Concatenate
+            if node[0] == '.':
+                fragments.push(concat(N, F1, F2))
+            # Union
+            else:
+                fragments.push(union(N, F1, F2))
+
+    return fragments.top()
+
+
+def parse_regex(regex):
+    if len(re.findall(r'[^\w\+\*\(\)\$]', regex)):
+        raise MalformedRegex
+    elif not match_parentheses(regex):
+        raise MalformedRegex
+    try:
+        return parse(tokenize(regex))
+    except PopException:
+        raise MalformedRegex
+
+
+def postfix(tree):
+    # The syntax tree as a postfix string, which needs no parentheses, so
+    # regexes that only differ in redundant ones give the same string
+    out = []
+    work = [tree]
+    while work:
+        node = work.pop()
+        if isinstance(node, str):
+            out.append(node)
+        elif node[0] == 'sym':
+            out.append(node[1])
+        else:
+            work.append(node[0])
+            work.extend(reversed(node[1:]))
+    return ''.join(out)
+
+
+def regex_to_NFA(regex):
+    tree = parse_regex(regex)
+    N = NFABuilder()
+    N.init_state, N.accept_state = build_NFA(N, tree)
+    return N.to_NFA()
@@ -0,0 +1,42 @@
+import os
+import sys
+
+CODES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'codes')
+sys.path.insert(0, CODES)
+
+from automata.binary import is_DFA_data, read_binary, write_binary
+from automata.determinize import determinize
+from automata.dfa import DFA, dfa_from_json
+from automata.equivalence import equivalence_counterexample
+from automata.nfa import NFA, nfa_from_json
+from automata.regex import regex_to_NFA
+
+
+def test_regex2nfa_output_is_not_a_dfa(tmp_path):
+    # Regex2NFA lists $ only in the transitions, never in letters
+    data = regex_to_NFA('ab').to_json()
+    assert '$' not in data['letters']
+    assert not is_DFA_data(data)
+
+    path = tmp_path / 'ab.bin'
+    write_binary(path, nfa_from_json(data))
+    nfa = read_binary(path)
+    assert isinstance(nfa, NFA)
+    assert equivalence_counterexample(nfa, regex_to_NFA('ab')) is None
+
+
+def test_letter_missing_from_letters_is_not_a_dfa():
+    data = {'states': ['p', 'q'], 'letters': ['a'], 'transition_function': [['p', 'b', 'q']],
+            'start_states': ['p'], 'final_states': ['q']}
+    assert not is_DFA_data(data)
+
+
+def test_dfa_round_trip(tmp_path):
+    data = determinize(regex_to_NFA('(a+b)*abb')).to_json()
+    assert is_DFA_data(data)
+
+    path = tmp_path / 'dfa.bin'
+    write_binary(path, dfa_from_json(data))
+    dfa = read_binary(path)
+    assert isinstance(dfa, DFA)
+    assert dfa.to_json() == data
@@ -0,0 +1,26 @@
+import os
+import sys
+
+CODES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'codes')
+sys.path.insert(0, CODES)
+
+from automata.cache import canonical_regex
+
+
+def key(regex):
+    return canonical_regex({'regex': regex})
+
+
+def test_redundant_parentheses_share_a_key():
+    assert key('((a))b') == key('a(b)') == key('ab')
+    assert key('((a+b))*c') == key('(a+b)*c')
+
+
+def test_different_trees_have_different_keys():
+    assert key('(a+b)+c') != key('a+(b+c)')
+    assert key('(ab)*') != key('ab*')
+
+
+def test_malformed_regex_never_shares_a_key():
+    # 'ab+' is malformed, and also the postfix of 'a+b'
+    assert key('ab+') != key('a+b')
@@ -0,0 +1,112 @@
+import itertools
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+
+import pytest
+
+CODES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'codes')
+sys.path.insert(0, CODES)
+
+from automata.determinize import determinize
+from automata.dfa2regex import gen_regex
+from automata.equivalence import (accepts, equivalence_counterexample,
+                                  inclusion_counterexample, load_language)
+from automata.minimize import minimize
+from automata.regex import regex_to_NFA
+
+WORDS = [''.join(w) for n in range(8) for w in itertools.product('ab', repeat=n)]
+
+
+def random_regex(rng, depth=0):
+    r = rng.random()
+    if depth > 2 or r < 0.3:
+        return rng.choice(['a', 'b', '$', '(a+b)'])
+    if r < 0.5:
+        return '(' + random_regex(rng, depth + 1) + ')*'
+    if r < 0.75:
+        return random_regex(rng, depth + 1) + random_regex(rng, depth + 1)
+    return '(' + random_regex(rng, depth + 1) + '+' + random_regex(rng, depth + 1) + ')'
+
+
+def matches(regex):
+    pattern = re.compile(regex.replace('+', '|').replace('$', '(?:)'))
+    return lambda w: pattern.fullmatch(w) is not None
+
+
+def check_equivalence(first, second):
+    return subprocess.run([sys.executable, os.path.join(CODES, '11.CheckEquivalence.py'), first, second],
+                          capture_output=True, text=True).returncode
+
+
+def test_counterexamples_are_shortest():
+    # Against the shortest disagreement found by enumerating all strings
+    rng = random.Random(0)
+    for _ in range(150):
+        x, y = random_regex(rng), random_regex(rng)
+        in_x, in_y = matches(x), matches(y)
+        a, b = regex_to_NFA(x), minimize(determinize(regex_to_NFA(y)))
+
+        word = equivalence_counterexample(a, b)
+        expected = next((w for w in WORDS if in_x(w) != in_y(w)), None)
+        if expected is None:
+            assert word is None or len(word) > len(WORDS[-1])
+        else:
+            assert word is not None and len(word) == len(expected)
+            assert in_x(''.join(word)) != in_y(''.join(word))
+            assert accepts(a, word) == in_x(''.join(word))
+
+        word = inclusion_counterexample(a, b)
+        expected = next((w for w in WORDS if in_x(w) and not in_y(w)), None)
+        if expected is None:
+            assert word is None or len(word) > len(WORDS[-1])
+        else:
+            assert word is not None and len(word) == len(expected)
+            assert in_x(''.join(word)) and not in_y(''.join(word))
+
+
+@pytest.fixture
+def outputs(tmp_path):
+    # The outputs of Q1 to Q4 for a regex without + or *, and Q3's output
+    # for the empty language
+    nfa = regex_to_NFA('ab')
+    dfa = determinize(nfa)
+    files = {
+        'regex': {'regex': 'ab'},
+        'nfa': nfa.to_json(),
+        'dfa': dfa.to_json(),
+        'min-dfa': minimize(dfa).to_json(),
+        'back': {'regex': gen_regex(minimize(dfa))},
+        'empty': {'regex': ''},
+        'malformed': {'regex': 'a+'},
+    }
+    paths = {}
+    for name, data in files.items():
+        paths[name] = str(tmp_path / f'{name}.json')
+        with open(paths[name], 'w') as f:
+            json.dump(data, f)
+    paths['missing'] = str(tmp_path / 'missing.json')
+    return paths
+
+
+def test_outputs_of_every_stage_load(outputs):
+    languages = [load_language(outputs[name]) for name in ('regex', 'nfa', 'dfa', 'min-dfa', 'back')]
+    for language in languages[1:]:
+        assert equivalence_counterexample(languages[0], language) is None
+
+
+def test_empty_regex_is_the_empty_language(outputs):
+    empty = load_language(outputs['empty'])
+    assert not accepts(empty, [])
+    assert inclusion_counterexample(empty, load_language(outputs['nfa'])) is None
+    assert equivalence_counterexample(empty, load_language(outputs['nfa'])) == ['a', 'b']
+
+
+def test_exit_statuses(outputs):
+    assert check_equivalence(outputs['nfa'], outputs['min-dfa']) == 0
+    assert check_equivalence(outputs['regex'], outputs['empty']) == 1
+    assert check_equivalence(outputs['regex'], outputs['missing']) == 2
+    assert check_equivalence(outputs['malformed'], outputs['regex']) == 2
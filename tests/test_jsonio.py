@@ -0,0 +1,45 @@
+import json
+import os
+import sys
+
+import pytest
+
+CODES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'codes')
+sys.path.insert(0, CODES)
+
+from automata.jsonio import read_json_stream
+
+DOCUMENT = {
+    'f': 15000000000.0,
+    'e': -2.5e-07,
+    'big': 1E+30,
+    'i': -12345,
+    'b': 1,
+    'names': ['q0', ['q1', 'q2'], 'a\\"b'],
+    'transition_function': [['q0', 'a', 'q1'], ['q1', 'b', 0.125], [3.5e3, 'c', -7]],
+    'flag': True,
+    'none': None,
+}
+
+
+@pytest.mark.parametrize('chunk_size', range(1, 12))
+@pytest.mark.parametrize('compact', [False, True])
+def test_small_chunks(tmp_path, chunk_size, compact):
+    path = tmp_path / 'doc.json'
+    with open(path, 'w') as f:
+        json.dump(DOCUMENT, f, separators=(',', ':') if compact else None)
+
+    members = {'transition_function': []}
+    for key, value in read_json_stream(path, ('transition_function',), chunk_size):
+        if key == 'transition_function':
+            members[key].append(value)
+        else:
+            members[key] = value
+    assert members == DOCUMENT
+
+
+def test_reported_case(tmp_path):
+    path = tmp_path / 'doc.json'
+    path.write_text('{"f": 15000000000.0, "b": 1}')
+    for chunk_size in (2, 3):
+        assert dict(read_json_stream(path, chunk_size=chunk_size)) == {'f': 15000000000.0, 'b': 1}
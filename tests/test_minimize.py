@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+CODES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'codes')
+sys.path.insert(0, CODES)
+
+from automata.dfa import dfa_from_json
+from automata.equivalence import equivalence_counterexample
+from automata.minimize import minimize
+
+
+def incomplete_dfa(transitions, finals):
+    states = sorted({s for s, _, _ in transitions} | {t for _, _, t in transitions})
+    return dfa_from_json({
+        'states': states,
+        'letters': ['a', 'b'],
+        'transition_function': [list(t) for t in transitions],
+        'start_states': ['p'],
+        'final_states': finals,
+    })
+
+
+@pytest.mark.parametrize('table_filling', [False, True])
+def test_missing_transitions_stay_missing(table_filling):
+    dfa = incomplete_dfa([('p', 'a', 'q'), ('q', 'a', 'r'), ('r', 'b', 'r')], ['r'])
+    minimal = minimize(dfa, table_filling)
+    assert minimal.n_states == 3
+    assert equivalence_counterexample(dfa, minimal) is None
+    assert minimal.to_json()['transition_function'] == [
+        [['p'], 'a', ['q']], [['q'], 'a', ['r']], [['r'], 'b', ['r']]]
+
+
+@pytest.mark.parametrize('table_filling', [False, True])
+def test_missing_transitions_join_a_dead_state(table_filling):
+    dfa = incomplete_dfa([('p', 'a', 'q'), ('q', 'a', 'r'), ('p', 'b', 'x'), ('x', 'a', 'x')], ['r'])
+    minimal = minimize(dfa, table_filling)
+    assert minimal.is_complete()
+    assert minimal.n_states == 4
+    assert equivalence_counterexample(dfa, minimal) is None
@@ -0,0 +1,107 @@
+import itertools
+import os
+import random
+import re
+import sys
+
+import pytest
+
+CODES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'codes')
+sys.path.insert(0, CODES)
+
+from automata.determinize import compress_step_masks, compute_step_masks, determinize
+from automata.dfa import DFA, dfa_from_json
+from automata.dfa2regex import gen_regex
+from automata.matcher import CompiledDFA
+from automata.minimize import minimize
+from automata.nfa import compute_ec
+from automata.nfa_simulation import NFASimulator
+from automata.pipeline import run_pipeline
+from automata.reachability import prune_DFA
+from automata.regex import regex_to_NFA
+
+# Every stage of regex -> NFA -> DFA -> minimal DFA -> regex is checked
+# against Python's re on all the strings up to MAX_LENGTH, including a
+# letter that no regex uses
+LETTERS = 'abc'
+MAX_LENGTH = 6
+WORDS = [''.join(w) for n in range(MAX_LENGTH + 1) for w in itertools.product(LETTERS + 'z', repeat=n)]
+
+FIXED = ['a', '$', 'a*', '(a+b)*', '(a+b)*abb', 'a(b+$)c', '((a*)*b)*', '(a+b+c)*c(a+b+c)', '(ab+ba)*(a+$)']
+
+
+def random_regex(rng, depth=0):
+    r = rng.random()
+    if depth > 3 or r < 0.3:
+        return rng.choice(LETTERS + '$') if rng.random() < 0.7 else \
+            '(' + '+'.join(rng.sample(LETTERS, rng.randrange(1, 4))) + ')'
+    if r < 0.5:
+        return '(' + random_regex(rng, depth + 1) + ')*'
+    if r < 0.75:
+        return random_regex(rng, depth + 1) + random_regex(rng, depth + 1)
+    return '(' + random_regex(rng, depth + 1) + '+' + random_regex(rng, depth + 1) + ')'
+
+
+REGEXES = FIXED + [random_regex(random.Random(seed)) for seed in range(60)]
+
+
+def python_language(regex):
+    pattern = re.compile(regex.replace('+', '|').replace('$', '(?:)'))
+    return [w for w in WORDS if pattern.fullmatch(w)]
+
+
+def language(automaton):
+    runner = CompiledDFA(automaton) if isinstance(automaton, DFA) else NFASimulator(automaton)
+    return [w for w in WORDS if runner.match(w)]
+
+
+def check_chain(expected, dfa):
+    for table_filling in (False, True):
+        minimal = minimize(dfa, table_filling)
+        assert language(minimal) == expected
+        regex = gen_regex(prune_DFA(minimal, prune_dead=True))
+        assert python_language(regex) == expected
+        assert language(regex_to_NFA(regex)) == expected
+
+
+@pytest.mark.parametrize('regex', REGEXES)
+def test_every_stage_matches_re(regex):
+    expected = python_language(regex)
+    nfa = regex_to_NFA(regex)
+    assert language(nfa) == expected
+
+    dfa = determinize(nfa)
+    assert language(dfa) == expected
+    if nfa.n_states <= 12:
+        exhaustive = determinize(nfa, exhaustive=True)
+        assert language(exhaustive) == expected
+        # The reachable subsets are a part of the full construction
+        transitions = exhaustive.to_json()['transition_function']
+        assert all(t in transitions for t in dfa.to_json()['transition_function'])
+    check_chain(expected, dfa)
+
+    stages = {}
+    run_pipeline(regex, 'regex', 'regex', on_stage=stages.__setitem__)
+    assert language(stages['min-dfa']) == expected
+    assert python_language(stages['regex']) == expected
+
+
+def test_incomplete_dfa():
+    dfa = dfa_from_json({
+        'states': ['p', 'q', 'r'],
+        'letters': ['a', 'b'],
+        'transition_function': [['p', 'a', 'q'], ['q', 'a', 'r'], ['r', 'b', 'r']],
+        'start_states': ['p'],
+        'final_states': ['r'],
+    })
+    expected = python_language('aab*')
+    assert language(dfa) == expected
+    check_chain(expected, dfa)
+
+
+def test_letter_unions_form_one_class():
+    # (a+b+c) is one pair of states, so a, b and c move every subset alike
+    nfa = regex_to_NFA('(a+b+c)*a(a+b+c)')
+    assert nfa.n_states == 8
+    _, classes = compress_step_masks(nfa, compute_step_masks(nfa, compute_ec(nfa)))
+    assert classes == [[0], [1, 2]]